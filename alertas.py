@@ -0,0 +1,256 @@
+# alertas.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import json
+import logging
+import queue
+import socket
+import threading
+import time
+import urllib.request
+
+from config import get_sound_file_path, get_alert_sinks, get_alert_debounce
+from config import get_alert_min_interval, get_alert_udp_address, get_alert_http_url
+
+# Descrição:
+# Este script implementa o despachante de alertas de sonolência.
+# O loop de frames apenas informa o estado de alerta de cada frame; as mudanças de estado são
+# colocadas em uma fila e tratadas por uma thread própria, de modo que o loop nunca bloqueia.
+# O despachante aplica o debounce (o novo estado precisa se manter por um tempo mínimo) e o
+# limite de frequência dos alertas, e repassa os eventos para os destinos (sinks) configurados:
+# som, log estruturado e notificação local por UDP ou HTTP.
+
+SINK_SOM = "som"
+SINK_LOG = "log"
+SINK_UDP = "udp"
+SINK_HTTP = "http"
+
+# Tipos de evento repassados aos destinos.
+EVENTO_ALERTA = "alerta"
+EVENTO_NORMAL = "normal"
+
+# Marcador colocado na fila para encerrar a thread do despachante.
+_FIM = object()
+
+logger = logging.getLogger("alertas")
+
+# Classe base dos destinos de alerta.
+
+
+class AlertSink:
+    def emitir(self, evento):
+        """
+        Recebe um evento de alerta ou de fim de alerta.
+
+        Argumentos:
+        evento -- Dicionário com "tipo" (alerta ou normal), "timestamp" e "origem".
+        """
+        raise NotImplementedError
+
+    def fechar(self):
+        pass
+
+# Toca o som de alerta. O pygame é importado e o som é decodificado na memória uma única vez, em
+# uma thread iniciada junto com o destino; quando o primeiro alerta chega, o som já está pronto.
+# Como o destino só é criado ao iniciar a detecção, o pygame fica fora da importação do main.py.
+
+
+class SomSink(AlertSink):
+    def __init__(self, sound_file_path):
+        self.sound_file_path = sound_file_path
+        self.pygame = None
+        self.som = None
+        self._pronto = threading.Event()
+        threading.Thread(target=self._preparar, name="carregar-som", daemon=True).start()
+
+    def _preparar(self):
+        try:
+            import pygame  # Usada para reprodução de som.
+            pygame.mixer.init()
+            try:
+                self.som = pygame.mixer.Sound(self.sound_file_path)
+            except pygame.error:
+                # Versões do pygame sem suporte a MP3 no mixer.Sound: o arquivo é carregado uma
+                # única vez no mixer.music, que passa a ser usado apenas para tocar e parar.
+                pygame.mixer.music.load(self.sound_file_path)
+            self.pygame = pygame
+        except Exception:
+            logger.exception("Erro ao carregar o som de alerta: %s", self.sound_file_path)
+        finally:
+            self._pronto.set()
+
+    def emitir(self, evento):
+        if evento["tipo"] != EVENTO_ALERTA:
+            return
+        # Normalmente o carregamento já terminou; se não, aguarda apenas o que falta.
+        self._pronto.wait()
+        if self.pygame is None:
+            return
+        if self.som is not None:
+            self.som.play()
+        else:
+            self.pygame.mixer.music.play()
+
+    def fechar(self):
+        if self.pygame is not None:
+            self.pygame.mixer.stop()
+
+# Registra os eventos como JSON no log.
+
+
+class LogSink(AlertSink):
+    def emitir(self, evento):
+        logger.warning(json.dumps(evento))
+
+# Envia os eventos como JSON em um datagrama UDP.
+
+
+class UdpSink(AlertSink):
+    def __init__(self, host, porta):
+        self.endereco = (host, porta)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def emitir(self, evento):
+        self.socket.sendto(json.dumps(evento).encode("utf-8"), self.endereco)
+
+    def fechar(self):
+        self.socket.close()
+
+# Envia os eventos como JSON em uma requisição HTTP POST.
+
+
+class HttpSink(AlertSink):
+    def __init__(self, url, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def emitir(self, evento):
+        requisicao = urllib.request.Request(
+            self.url, data=json.dumps(evento).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST")
+        urllib.request.urlopen(requisicao, timeout=self.timeout).close()
+
+
+class AlertDispatcher(threading.Thread):
+    def __init__(self, sinks, debounce=0.0, intervalo_minimo=0.0, fluxo=None, dono_sinks=True):
+        super().__init__(name="alertas", daemon=True)
+        self.sinks = sinks
+        # Nome do fluxo de vídeo incluído nos eventos quando há várias câmeras.
+        self.fluxo = fluxo
+        # Destinos compartilhados entre vários despachantes são fechados por quem os criou.
+        self.dono_sinks = dono_sinks
+        # Tempo (s) que um novo estado precisa se manter antes de ser repassado aos destinos.
+        self.debounce = debounce
+        # Intervalo mínimo (s) entre dois alertas repassados aos destinos.
+        self.intervalo_minimo = intervalo_minimo
+        self._fila = queue.Queue()
+        # Último estado informado pelo loop de frames, usado para enfileirar apenas as mudanças.
+        self._ultimo_informado = False
+        # Estado confirmado após o debounce.
+        self.estado = False
+        self._ultimo_alerta = None
+        self._suprimido = False
+        self.alertas_emitidos = 0
+        self.alertas_suprimidos = 0
+
+    def notificar(self, alerta, timestamp=None, origem=()):
+        """
+        Informa o estado de alerta de um frame. Não bloqueia: apenas as mudanças de estado
+        são colocadas na fila da thread do despachante.
+
+        Argumentos:
+        alerta -- True se alguma técnica detectou sonolência no frame.
+        timestamp -- Instante de captura do frame, em segundos.
+        origem -- Nomes das técnicas que detectaram sonolência.
+        """
+        if alerta != self._ultimo_informado:
+            self._ultimo_informado = alerta
+            self._fila.put((alerta, timestamp, tuple(origem), time.monotonic()))
+
+    def run(self):
+        pendente = None
+        while True:
+            # Com um estado pendente, acorda periodicamente para verificar o debounce.
+            try:
+                item = self._fila.get(timeout=0.05 if pendente else None)
+            except queue.Empty:
+                item = None
+            if item is _FIM:
+                break
+            if item is not None:
+                pendente = item if item[0] != self.estado else None
+            if pendente and time.monotonic() - pendente[3] >= self.debounce:
+                self._confirmar(*pendente[:3])
+                pendente = None
+
+        if self.dono_sinks:
+            fechar_sinks(self.sinks)
+
+    def _confirmar(self, alerta, timestamp, origem):
+        self.estado = alerta
+        agora = time.monotonic()
+        if alerta:
+            # Limita a frequência dos alertas; o fim de um alerta suprimido também é suprimido.
+            if self._ultimo_alerta is not None and agora - self._ultimo_alerta < self.intervalo_minimo:
+                self._suprimido = True
+                self.alertas_suprimidos += 1
+                return
+            self._ultimo_alerta = agora
+            self.alertas_emitidos += 1
+        elif self._suprimido:
+            self._suprimido = False
+            return
+
+        evento = {"tipo": EVENTO_ALERTA if alerta else EVENTO_NORMAL,
+                  "timestamp": timestamp, "origem": list(origem)}
+        if self.fluxo is not None:
+            evento["fluxo"] = self.fluxo
+        for sink in self.sinks:
+            # Uma falha em um destino não impede os demais nem derruba o despachante.
+            try:
+                sink.emitir(evento)
+            except Exception:
+                logger.exception("Falha ao enviar o alerta para %s", type(sink).__name__)
+
+    def encerrar(self):
+        # Encerra a thread após tratar os eventos que já estão na fila.
+        self._fila.put(_FIM)
+        self.join()
+
+# Cria os destinos de alerta configurados no arquivo de configuração.
+
+
+def criar_sinks_alertas():
+    sinks = []
+    for nome in get_alert_sinks():
+        if nome == SINK_SOM:
+            sinks.append(SomSink(get_sound_file_path()))
+        elif nome == SINK_LOG:
+            sinks.append(LogSink())
+        elif nome == SINK_UDP:
+            host, porta = get_alert_udp_address()
+            sinks.append(UdpSink(host, porta))
+        elif nome == SINK_HTTP:
+            sinks.append(HttpSink(get_alert_http_url()))
+        else:
+            raise ValueError(f"Destino de alerta desconhecido: {nome}")
+    return sinks
+
+# Fecha os destinos de alerta.
+
+
+def fechar_sinks(sinks):
+    for sink in sinks:
+        sink.fechar()
+
+# Cria e inicia um despachante. Sem destinos informados, cria os configurados no config.ini,
+# que passam a pertencer ao despachante; destinos informados podem ser compartilhados.
+
+
+def criar_despachante_alertas(sinks=None, fluxo=None):
+    proprios = sinks is None
+    if proprios:
+        sinks = criar_sinks_alertas()
+    despachante = AlertDispatcher(sinks, get_alert_debounce(), get_alert_min_interval(),
+                                  fluxo, dono_sinks=proprios)
+    despachante.start()
+    return despachante
@@ -0,0 +1,309 @@
+# batch_analysis.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import argparse
+import csv
+import os
+from collections import Counter
+from multiprocessing import Pool
+
+import cv2
+from utils import initialize_video, initialize_detector, RelogioVideo, FPS_PADRAO, mapa_pontos
+from config import get_ear_threshold, get_tempo_alerta, get_perclos_window, get_blink_window
+from config import adicionar_argumentos_configuracao, aplicar_argumentos_configuracao
+from config import estado_sobrescritas, restaurar_sobrescritas
+from metricas import TECNICAS, criar_consumidores
+from fused_detector import FusedEngine
+from face_tracker import criar_localizador_faces
+from driver_selector import criar_seletor_motorista
+from landmark_cache import LandmarkCache, GravadorCache, chave_cache, reproduzir
+
+# Descrição:
+# Este script analisa vídeos gravados em lote, sem interface gráfica.
+# Cada vídeo (ou cada trecho de um vídeo longo) é processado por um processo de um pool do
+# multiprocessing, que carrega o detector de faces e o preditor de pontos faciais uma única vez.
+# Os resultados de cada frame (EAR, PERCLOS e piscadas), os eventos de piscada e um resumo por
+# arquivo são gravados em CSV ou Parquet. Antes de cada trecho, as métricas são aquecidas com os
+# frames anteriores (a maior janela entre as métricas), de modo que as métricas de janela de cada
+# frame não dependem do número de trechos (ver analisar_trecho). Com a opção --cache, os pontos faciais de cada trecho
+# são gravados em cache (landmark_cache.py) e, nas execuções seguintes, reproduzidos sem rodar o
+# dlib novamente.
+#
+# Exemplo de uso:
+#   python batch_analysis.py viagem1.mp4 viagem2.mp4 --processos 4 --trechos 8 --saida resultados
+
+# Detector e preditor carregados uma única vez por processo do pool.
+_detector = None
+_predictor = None
+
+
+def _inicializar_processo(sobrescritas):
+    global _detector, _predictor
+    # Aplica o arquivo de configuração e os valores de --set do processo principal.
+    restaurar_sobrescritas(sobrescritas)
+    _detector, _predictor = initialize_detector()
+
+# Duração (s) do aquecimento das métricas antes de cada trecho: a maior janela entre as métricas
+# (PERCLOS_WINDOW, BLINK_WINDOW e TEMPO_ALERTA).
+
+
+def duracao_aquecimento():
+    return max(get_perclos_window(), get_blink_window(), get_tempo_alerta())
+
+# Divide um vídeo em trechos de frames aproximadamente iguais.
+
+
+def dividir_em_trechos(video_path, trechos):
+    """
+    Divide um vídeo em trechos, cada um com os frames de aquecimento que o antecedem.
+
+    Retorna:
+    trechos -- Lista de tuplas (video_path, frame_inicio, frame_fim, aquecimento), em que
+               aquecimento é o número de frames anteriores ao trecho usados apenas para
+               aquecer as métricas.
+    """
+    video = initialize_video(video_path)
+    total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = video.get(cv2.CAP_PROP_FPS) or FPS_PADRAO
+    video.release()
+
+    # Sem a contagem de frames não é possível dividir: o vídeo é processado inteiro.
+    if trechos <= 1 or total_frames <= 0:
+        return [(video_path, 0, None, 0)]
+    tamanho = -(-total_frames // trechos)
+    aquecimento = int(round(duracao_aquecimento() * fps))
+    return [(video_path, inicio, min(inicio + tamanho, total_frames), min(inicio, aquecimento))
+            for inicio in range(0, total_frames, tamanho)]
+
+# Processa os frames [inicio, fim) de um vídeo com o motor unificado, chamando ao_processar com o
+# índice e o resultado de cada frame.
+
+
+def _processar_video(video_path, inicio, fim, consumidores, ao_processar):
+    video = initialize_video(video_path)
+    if inicio:
+        video.set(cv2.CAP_PROP_POS_FRAMES, inicio)
+    # O instante de cada frame é o tempo do vídeo (CAP_PROP_POS_MSEC), e não o tempo de
+    # processamento, de modo que o resultado não depende da velocidade da análise.
+    relogio = RelogioVideo(video, arquivo=True, indice_inicial=inicio)
+    motor = FusedEngine(criar_localizador_faces(_detector), _predictor, consumidores,
+                        seletor=criar_seletor_motorista())
+
+    indice = inicio
+    try:
+        while fim is None or indice < fim:
+            ret, frame = video.read()
+            if not ret:
+                break
+            ao_processar(motor, indice, motor.processar_frame(frame, relogio()))
+            indice += 1
+    finally:
+        video.release()
+
+# Processa um trecho de um vídeo e retorna as linhas com os resultados de cada frame.
+
+
+def analisar_trecho(tarefa):
+    """
+    Processa os frames de um trecho de vídeo com o motor unificado, sem exibir janelas.
+
+    As métricas são aquecidas com os frames que antecedem o trecho (ver duracao_aquecimento),
+    que não entram no resultado. Assim, o EAR, o PERCLOS e o seu alerta, o tempo com os olhos
+    fechados e os eventos de piscada de cada frame são os mesmos com qualquer número de trechos.
+    Dependem da divisão apenas os valores com memória maior que a janela:
+    - piscadas e tempo_acumulado_fechado são acumulados desde o início do trecho (o resumo do
+      arquivo soma as piscadas dos trechos);
+    - alerta_ear, que permanece ativo depois de disparado, só considera o trecho e o aquecimento;
+    - taxa_piscadas, media_duracao_piscadas e alerta_piscadas decaem exponencialmente com a
+      constante BLINK_WINDOW, e o aquecimento cobre apenas uma constante de tempo.
+
+    Argumentos:
+    tarefa -- Tupla (video_path, frame_inicio, frame_fim, aquecimento, tecnicas,
+              diretorio_cache, chave). frame_fim None lê até o fim; diretorio_cache None
+              desativa o cache.
+
+    Retorna:
+    linhas -- Lista de dicionários, um por frame, com o EAR e os valores de cada técnica.
+    """
+    video_path, frame_inicio, frame_fim, aquecimento, tecnicas, diretorio_cache, chave = tarefa
+    arquivo = os.path.basename(video_path)
+    inicio_aquecimento = frame_inicio - aquecimento
+
+    consumidores = criar_consumidores(
+        tecnicas, get_ear_threshold(), get_tempo_alerta())
+    # Piscadas contadas no aquecimento, descontadas das linhas do trecho.
+    piscadas_aquecimento = 0
+
+    def linha(indice, timestamp, faces, ear, alerta):
+        valores = {"arquivo": arquivo, "frame": indice, "timestamp": timestamp,
+                   "faces": faces, "ear": ear, "alerta": alerta}
+        for consumidor in consumidores:
+            valores.update(consumidor.valores())
+        if "piscadas" in valores:
+            valores["piscadas"] -= piscadas_aquecimento
+        return valores
+
+    def contar_piscadas():
+        return sum(consumidor.valores().get("piscadas", 0) for consumidor in consumidores)
+
+    # Se o trecho já está em cache, as métricas são reproduzidas sem rodar o dlib.
+    # O cache guarda apenas a face usada nas métricas, por isso "faces" vale 0 ou 1.
+    cache = LandmarkCache(diretorio_cache, chave) if diretorio_cache else None
+    if cache is not None and cache.existe(frame_inicio, frame_fim):
+        if aquecimento:
+            # O aquecimento vem do cache dos trechos anteriores ou, se não estiverem em cache,
+            # do próprio vídeo.
+            partes = cache.intervalo(inicio_aquecimento, frame_inicio)
+            if partes is not None:
+                for parte in partes:
+                    for _ in reproduzir(*parte, consumidores):
+                        pass
+            else:
+                _processar_video(video_path, inicio_aquecimento, frame_inicio, consumidores,
+                                 lambda motor, indice, resultado: None)
+            piscadas_aquecimento = contar_piscadas()
+        return [linha(frame_inicio + i, timestamp, int(ear is not None), ear, alerta)
+                for i, (timestamp, ear, alerta)
+                in enumerate(reproduzir(*cache.carregar(frame_inicio, frame_fim), consumidores))]
+
+    linhas = []
+    gravador = GravadorCache(mapa_pontos(_predictor.num_parts).num_pontos)
+
+    def ao_processar(motor, indice, resultado):
+        nonlocal piscadas_aquecimento
+        if indice < frame_inicio:
+            return
+        if indice == frame_inicio:
+            # Primeiro frame do trecho: o aquecimento terminou.
+            piscadas_aquecimento = contar_piscadas()
+        if cache is not None:
+            gravador.adicionar(resultado)
+        linhas.append(linha(indice, resultado.timestamp, len(resultado.faces),
+                            resultado.ear, resultado.alerta))
+
+    _processar_video(video_path, inicio_aquecimento, frame_fim, consumidores, ao_processar)
+    if cache is not None:
+        gravador.salvar(cache, frame_inicio, frame_fim)
+    return linhas
+
+# Resume os resultados de um arquivo, processado em um ou mais trechos, em uma única linha.
+
+
+def resumir_arquivo(trechos):
+    linhas = [linha for trecho in trechos for linha in trecho]
+    ears = [linha["ear"] for linha in linhas if linha["ear"] is not None]
+    resumo = {"arquivo": linhas[0]["arquivo"],
+              "frames": len(linhas),
+              "frames_com_face": len(ears),
+              "duracao_s": linhas[-1]["timestamp"] - linhas[0]["timestamp"],
+              "ear_medio": sum(ears) / len(ears) if ears else None,
+              "frames_em_alerta": sum(1 for linha in linhas if linha["alerta"])}
+    if "perclos" in linhas[-1]:
+        resumo["perclos_maximo"] = max(linha["perclos"] for linha in linhas)
+    if "piscadas" in linhas[-1]:
+        # As piscadas são contadas por trecho, por isso o total soma o último valor de cada trecho.
+        resumo["piscadas"] = sum(trecho[-1]["piscadas"] for trecho in trechos if trecho)
+    return resumo
+
+# Grava uma lista de dicionários em CSV ou Parquet.
+
+
+def gravar_tabela(linhas, caminho, formato):
+    if formato == "parquet":
+        # O pandas (com pyarrow) só é necessário para a saída em Parquet.
+        try:
+            import pandas as pd
+        except ImportError:
+            raise Exception(
+                "A saída em Parquet requer o pandas e o pyarrow instalados.")
+        pd.DataFrame(linhas).to_parquet(caminho + ".parquet", index=False)
+        return
+
+    campos = []
+    for linha in linhas:
+        campos.extend(campo for campo in linha if campo not in campos)
+    with open(caminho + ".csv", "w", newline="") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=campos)
+        escritor.writeheader()
+        escritor.writerows(linhas)
+
+# Grava as tabelas de frames e de piscadas de um vídeo e retorna o seu resumo.
+
+
+def gravar_video(video_path, trechos, saida, formato):
+    linhas = [linha for trecho in trechos for linha in trecho]
+    if not linhas:
+        print(f"{video_path}: nenhum frame lido.")
+        return None
+    nome = os.path.splitext(os.path.basename(video_path))[0]
+    gravar_tabela(linhas, os.path.join(saida, f"{nome}_frames"), formato)
+    # Os eventos de piscada e de fechamento dos olhos são gravados em uma tabela própria.
+    eventos = [{"arquivo": linha["arquivo"], "inicio": linha["piscada_inicio"],
+                "fim": linha["timestamp"], "duracao": linha["piscada_duracao"],
+                "ear_minimo": linha["piscada_ear_minimo"], "tipo": linha["piscada_tipo"]}
+               for linha in linhas if linha.get("piscada_duracao") is not None]
+    if eventos:
+        gravar_tabela(eventos, os.path.join(saida, f"{nome}_piscadas"), formato)
+    return resumir_arquivo(trechos)
+
+# Processa todos os vídeos no pool de processos e grava os resultados.
+
+
+def analisar_videos(videos, saida=".", processos=None, trechos=1,
+                    formato="csv", tecnicas=TECNICAS, diretorio_cache=None):
+    os.makedirs(saida, exist_ok=True)
+    # A chave do cache de cada vídeo (hash do vídeo, do modelo e da configuração) é calculada
+    # uma única vez, antes de dividir o trabalho.
+    chaves = {video_path: chave_cache(video_path) if diretorio_cache else None
+              for video_path in videos}
+    tarefas = [trecho + (tuple(tecnicas), diretorio_cache, chaves[video_path])
+               for video_path in videos
+               for trecho in dividir_em_trechos(video_path, trechos)]
+
+    # Os trechos de cada vídeo chegam em ordem (pool.imap); assim que o último trecho de um
+    # vídeo termina, as suas tabelas são gravadas e as linhas descartadas, de modo que apenas
+    # as linhas de um vídeo (e o resumo dos anteriores) ficam em memória.
+    trechos_restantes = Counter(tarefa[0] for tarefa in tarefas)
+    resultados = {}
+    resumos = []
+    with Pool(processos, initializer=_inicializar_processo,
+              initargs=(estado_sobrescritas(),)) as pool:
+        for tarefa, linhas in zip(tarefas, pool.imap(analisar_trecho, tarefas)):
+            video_path = tarefa[0]
+            resultados.setdefault(video_path, []).append(linhas)
+            print(f"{os.path.basename(video_path)}: trecho a partir do frame "
+                  f"{tarefa[1]} concluído ({len(linhas)} frames)")
+            trechos_restantes[video_path] -= 1
+            if trechos_restantes[video_path] == 0:
+                resumo = gravar_video(video_path, resultados.pop(video_path), saida, formato)
+                if resumo is not None:
+                    resumos.append(resumo)
+
+    if resumos:
+        gravar_tabela(resumos, os.path.join(saida, "resumo"), formato)
+    return resumos
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Análise em lote de vídeos gravados, sem interface gráfica.")
+    parser.add_argument("videos", nargs="+", help="Arquivos de vídeo a analisar.")
+    parser.add_argument("--saida", default=".",
+                        help="Diretório onde os resultados são gravados.")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Número de processos do pool (padrão: número de CPUs).")
+    parser.add_argument("--trechos", type=int, default=1,
+                        help="Número de trechos em que cada vídeo é dividido.")
+    parser.add_argument("--formato", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--tecnicas", nargs="+", choices=TECNICAS, default=list(TECNICAS))
+    parser.add_argument("--cache", default=None,
+                        help="Diretório do cache de pontos faciais (landmark_cache.py).")
+    adicionar_argumentos_configuracao(parser)
+    args = parser.parse_args()
+    aplicar_argumentos_configuracao(args)
+
+    analisar_videos(args.videos, args.saida, args.processos, args.trechos,
+                    args.formato, args.tecnicas, args.cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+# benchmark.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import argparse
+import json
+import platform
+import time
+
+import cv2
+import dlib
+import numpy as np
+from utils import initialize_video, initialize_detector
+from config import get_ear_threshold, get_tempo_alerta
+from config import adicionar_argumentos_configuracao, aplicar_argumentos_configuracao
+from config import get_face_detector_backend
+from metricas import TECNICAS, criar_consumidores
+from fused_detector import FusedEngine, desenhar_overlay
+from face_tracker import criar_localizador_faces, TrackingFaceDetector
+from face_detectors import backend_deteccao
+from cronometro import StageTimer
+from alertas import criar_despachante_alertas
+from buffers import FramePool, ContadorMemoria
+from landmark_gate import criar_portao_landmarks
+from driver_selector import criar_seletor_motorista
+from quality_scheduler import criar_escalonador_qualidade
+
+# Descrição:
+# Este script mede, de forma reproduzível, o desempenho do motor unificado etapa por etapa:
+# captura, conversão para cinza, detecção de faces, shape_predictor, EAR, métricas, overlay e
+# despacho do alerta. Para cada etapa são reportados a média e os percentis p50/p95/p99 da
+# latência, além da vazão em frames por segundo. O resultado é gravado em JSON e pode ser
+# comparado com o de uma execução anterior.
+#
+# Exemplos de uso:
+#   python benchmark.py --video gravacao.mp4 --saida atual.json
+#   python benchmark.py --sintetico --frames 300 --saida atual.json --comparar anterior.json
+
+# Ordem em que as etapas são exibidas.
+ETAPAS = ("captura", "conversao_cinza", "deteccao", "portao_landmarks", "landmarks", "ear",
+          "metricas", "overlay", "alerta", "total")
+
+# Semente usada na geração dos frames sintéticos.
+SEMENTE_SINTETICA = 1234
+
+
+# Fonte de vídeo sintética: sempre os mesmos frames, gerados a partir de uma semente fixa.
+
+
+class FonteSintetica:
+    def __init__(self, frames, largura=640, altura=480):
+        gerador = np.random.default_rng(SEMENTE_SINTETICA)
+        self.base = gerador.integers(0, 256, (altura, largura, 3), dtype=np.uint8)
+        # Desenha uma elipse clara no centro, simulando a região do rosto.
+        cv2.ellipse(self.base, (largura // 2, altura // 2), (largura // 8, altura // 4),
+                    0, 0, 360, (180, 180, 180), -1)
+        self.restantes = frames
+
+    def read(self, image=None):
+        if self.restantes <= 0:
+            return False, None
+        self.restantes -= 1
+        # Copia o frame para simular a alocação feita por uma captura real; com image, o frame
+        # é copiado no buffer informado, como no VideoCapture.read(image).
+        if image is not None:
+            np.copyto(image, self.base)
+            return True, image
+        return True, self.base.copy()
+
+    def release(self):
+        pass
+
+# Nos frames sintéticos o detector não encontra faces; para que o shape_predictor também seja
+# medido, uma caixa fixa no centro do frame é usada quando nenhuma face é detectada.
+
+
+class DetectorComCaixaFixa:
+    def __init__(self, detector, largura, altura):
+        self.detector = detector
+        self.caixa = dlib.rectangle(largura * 3 // 8, altura // 4,
+                                    largura * 5 // 8, altura * 3 // 4)
+
+    def __call__(self, gray, frame=None):
+        return list(self.detector(gray, frame=frame)) or [self.caixa]
+
+# Despachante de alerta vazio, usado quando os alertas não devem fazer parte da medição.
+
+
+class AlertaNulo:
+    def notificar(self, alerta, timestamp=None, origem=()):
+        pass
+
+    def encerrar(self):
+        pass
+
+
+def executar_benchmark(fonte, motor, despachante, aquecimento=10, contador_memoria=None):
+    """
+    Processa todos os frames da fonte e mede o tempo de cada etapa.
+
+    Argumentos:
+    fonte -- Objeto com o método read(), como o cv2.VideoCapture.
+    motor -- FusedEngine cujo cronômetro guarda as amostras.
+    despachante -- Despachante de alertas (alertas.AlertDispatcher ou AlertaNulo).
+    aquecimento -- Número de frames iniciais descartados das estatísticas.
+    contador_memoria -- buffers.ContadorMemoria opcional, atualizado a cada frame medido.
+
+    Retorna:
+    resultado -- Dicionário com a vazão e o resumo da latência de cada etapa.
+    """
+    cronometro = motor.cronometro
+    frames = 0
+    inicio = None
+    while True:
+        # As amostras do aquecimento são descartadas ao chegar no primeiro frame medido.
+        if frames == aquecimento:
+            cronometro.amostras.clear()
+            backend = backend_deteccao(motor.detector)
+            if backend is not None:
+                backend.zerar()
+            if isinstance(motor.detector, TrackingFaceDetector):
+                motor.detector.zerar()
+            if motor.seletor is not None:
+                motor.seletor.zerar()
+            inicio = time.perf_counter()
+
+        inicio_frame = time.perf_counter()
+        with cronometro.etapa("captura"):
+            if motor.buffers is not None:
+                ret, frame = motor.buffers.ler(fonte)
+            else:
+                ret, frame = fonte.read()
+        if not ret:
+            break
+
+        resultado = motor.processar_frame(frame, time.monotonic())
+        with cronometro.etapa("alerta"):
+            motor.notificar(despachante, resultado)
+        escalonador = motor.escalonador
+        with cronometro.etapa("overlay"):
+            desenhar_overlay(frame, resultado, motor.consumidores, 0,
+                             desenhar_olhos=escalonador is None or escalonador.atual.olhos)
+        cronometro.registrar("total", time.perf_counter() - inicio_frame)
+        if escalonador is not None:
+            escalonador.registrar(time.perf_counter() - inicio_frame)
+        if contador_memoria is not None and frames >= aquecimento:
+            contador_memoria.frame()
+        frames += 1
+
+    medidos = max(0, frames - aquecimento)
+    duracao = time.perf_counter() - inicio if inicio is not None else 0
+    resultado = {"frames": medidos,
+                 "vazao_fps": medidos / duracao if duracao > 0 else 0,
+                 "etapas": cronometro.resumo(),
+                 "deteccao_faces": motor.valores_deteccao()}
+    if contador_memoria is not None:
+        resultado["memoria"] = contador_memoria.valores()
+    if motor.portao is not None:
+        resultado["portao_landmarks"] = motor.portao.valores()
+    if motor.escalonador is not None:
+        resultado["qualidade"] = motor.escalonador.valores()
+    return resultado
+
+# Exibe o resultado em forma de tabela e, se houver, a variação em relação a outra execução.
+
+
+def exibir(resultado, anterior=None):
+    print(f"Frames medidos: {resultado['frames']}  Vazão: {resultado['vazao_fps']:.2f} FPS")
+    print(f"{'etapa':<16}{'media':>9}{'p50':>9}{'p95':>9}{'p99':>9}   (ms)")
+    for etapa in ETAPAS:
+        valores = resultado["etapas"].get(etapa)
+        if valores is None:
+            continue
+        linha = f"{etapa:<16}{valores['media_ms']:>9.2f}{valores['p50_ms']:>9.2f}" \
+                f"{valores['p95_ms']:>9.2f}{valores['p99_ms']:>9.2f}"
+        base = anterior["etapas"].get(etapa) if anterior else None
+        if base and base["p95_ms"] > 0:
+            variacao = (valores["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100
+            linha += f"   p95 {variacao:+.1f}%"
+        print(linha)
+    if anterior and anterior["vazao_fps"] > 0:
+        variacao = (resultado["vazao_fps"] - anterior["vazao_fps"]) / anterior["vazao_fps"] * 100
+        print(f"Vazão {variacao:+.1f}% em relação à execução anterior.")
+    deteccao = resultado.get("deteccao_faces")
+    if deteccao and "detector_chamadas" in deteccao:
+        linha = f"Detector de faces: {deteccao['detector_tempo_medio_ms']:.2f} ms por chamada " \
+                f"({deteccao['detector_chamadas']} chamadas)"
+        base = (anterior or {}).get("deteccao_faces") or {}
+        if base.get("detector_tempo_medio_ms"):
+            linha += f"   (anterior: {base['detector_tempo_medio_ms']:.2f} ms)"
+        print(linha)
+    if deteccao and "deteccoes_completas" in deteccao:
+        print(f"Detecções completas: {deteccao['deteccoes_completas']}/"
+              f"{deteccao['frames_localizados']} frames "
+              f"({deteccao['taxa_deteccao'] * 100:.1f}%)")
+    if deteccao and "faces_ignoradas" in deteccao:
+        print(f"Faces descartadas pela seleção do motorista: {deteccao['faces_ignoradas']}")
+    portao = resultado.get("portao_landmarks")
+    if portao:
+        print(f"Landmarks reutilizados: {portao['reutilizados']}/{portao['frames']} "
+              f"({portao['taxa_acerto'] * 100:.1f}%)")
+    qualidade = resultado.get("qualidade")
+    if qualidade:
+        print(f"Nível de qualidade final: {qualidade['nivel_qualidade']} "
+              f"({qualidade['mudancas_nivel']} mudanças, orçamento {qualidade['orcamento_ms']:.0f} ms)")
+    memoria = resultado.get("memoria")
+    if memoria:
+        linha = f"Alocado: {memoria['bytes_por_frame'] / 1024:.1f} KB/frame  " \
+                f"Coletas do GC: {memoria['coletas_gc']}"
+        base = anterior.get("memoria") if anterior else None
+        if base and "bytes_por_frame" in base:
+            linha += f"   (anterior: {base['bytes_por_frame'] / 1024:.1f} KB/frame)"
+        print(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark por etapa do motor de detecção de sonolência.")
+    fonte = parser.add_mutually_exclusive_group(required=True)
+    fonte.add_argument("--video", help="Arquivo de vídeo usado no benchmark.")
+    fonte.add_argument("--sintetico", action="store_true",
+                       help="Usa frames sintéticos gerados a partir de uma semente fixa.")
+    parser.add_argument("--frames", type=int, default=300,
+                        help="Número de frames sintéticos.")
+    parser.add_argument("--resolucao", default="640x480",
+                        help="Resolução dos frames sintéticos (LARGURAxALTURA).")
+    parser.add_argument("--aquecimento", type=int, default=10,
+                        help="Frames iniciais descartados das estatísticas.")
+    parser.add_argument("--com-alertas", action="store_true",
+                        help="Inclui o despachante de alertas configurado na medição.")
+    parser.add_argument("--tecnicas", nargs="+", choices=TECNICAS, default=list(TECNICAS))
+    parser.add_argument("--buffers", action="store_true",
+                        help="Reutiliza os buffers do frame, da imagem em cinza e dos pontos faciais.")
+    parser.add_argument("--memoria", action="store_true",
+                        help="Mede a memória alocada (tracemalloc) e as coletas do GC por frame.")
+    parser.add_argument("--saida", help="Arquivo JSON onde o resultado é gravado.")
+    parser.add_argument("--comparar", help="Arquivo JSON de uma execução anterior.")
+    adicionar_argumentos_configuracao(parser)
+    args = parser.parse_args()
+    aplicar_argumentos_configuracao(args)
+
+    detector, predictor = initialize_detector()
+    if args.sintetico:
+        largura, altura = (int(valor) for valor in args.resolucao.split("x"))
+        fonte_video = FonteSintetica(args.frames + args.aquecimento, largura, altura)
+        detector = DetectorComCaixaFixa(detector, largura, altura)
+    else:
+        fonte_video = initialize_video(args.video)
+
+    consumidores = criar_consumidores(
+        args.tecnicas, get_ear_threshold(), get_tempo_alerta())
+    localizador = criar_localizador_faces(detector)
+    escalonador = criar_escalonador_qualidade()
+    if escalonador is not None:
+        localizador = escalonador.preparar(localizador)
+    motor = FusedEngine(localizador, predictor, consumidores,
+                        StageTimer(guardar_amostras=True),
+                        buffers=FramePool() if args.buffers else None,
+                        portao=criar_portao_landmarks(),
+                        seletor=criar_seletor_motorista(), escalonador=escalonador)
+    contador_memoria = ContadorMemoria() if args.memoria or args.buffers else None
+    despachante = criar_despachante_alertas() if args.com_alertas else AlertaNulo()
+
+    resultado = executar_benchmark(fonte_video, motor, despachante, args.aquecimento,
+                                   contador_memoria)
+    if contador_memoria is not None:
+        contador_memoria.fechar()
+    fonte_video.release()
+    despachante.encerrar()
+
+    # Metadados que permitem saber se duas execuções são comparáveis.
+    resultado["metadados"] = {
+        "fonte": args.video or f"sintetico:{args.resolucao}",
+        "tecnicas": args.tecnicas,
+        "detector_faces": get_face_detector_backend(),
+        "buffers": args.buffers,
+        "portao_landmarks": motor.portao is not None,
+        "selecao_motorista": motor.seletor is not None,
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "dlib": getattr(dlib, "__version__", "desconhecida"),
+        "plataforma": platform.platform(),
+        "processador": platform.processor(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar) as arquivo:
+            anterior = json.load(arquivo)
+    exibir(resultado, anterior)
+
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            json.dump(resultado, arquivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
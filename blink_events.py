@@ -0,0 +1,99 @@
+# blink_events.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import math
+from collections import namedtuple
+
+# Descrição:
+# Este script segmenta a sequência de EARs em eventos de piscada e de fechamento dos olhos.
+# Todos os tempos vêm do instante de captura de cada frame, e não do relógio do processamento,
+# de modo que o resultado é o mesmo com a câmera ao vivo, com frames descartados ou com um vídeo
+# reproduzido muitas vezes mais rápido que o tempo real. As estatísticas da janela (taxa de
+# piscadas e duração média) decaem exponencialmente com o tempo, usando memória constante.
+
+TIPO_PISCADA = "piscada"
+TIPO_FECHAMENTO = "fechamento"
+
+# Evento emitido quando os olhos voltam a abrir:
+# inicio -- Instante do primeiro frame com os olhos fechados.
+# fim -- Instante do primeiro frame com os olhos abertos novamente.
+# duracao -- fim - inicio, em segundos.
+# ear_minimo -- Menor EAR observado durante o evento.
+# tipo -- TIPO_PISCADA, ou TIPO_FECHAMENTO se a duração atingir o limite de piscada.
+EventoPiscada = namedtuple("EventoPiscada", ["inicio", "fim", "duracao", "ear_minimo", "tipo"])
+
+
+class BlinkSegmenter:
+    def __init__(self, ear_threshold, limite_piscada=0.4, janela=60.0):
+        self.ear_threshold = ear_threshold
+        # Duração (s) a partir da qual o evento é considerado um fechamento, e não uma piscada.
+        self.limite_piscada = limite_piscada
+        # Constante de tempo (s) do decaimento das estatísticas da janela.
+        self.janela = janela
+        self.inicio = None
+        self.ear_minimo = None
+        self.eventos = 0
+        # Soma dos pesos e das durações dos eventos, decaídos até o instante _instante.
+        self._peso = 0.0
+        self._soma_duracao = 0.0
+        self._instante = None
+        self._primeiro_timestamp = None
+
+    def atualizar(self, ear, timestamp):
+        """
+        Processa o EAR de um frame.
+
+        Argumentos:
+        ear -- EAR médio dos dois olhos, ou None se nenhuma face foi encontrada. Os frames sem
+               face não encerram nem iniciam um evento.
+        timestamp -- Instante de captura do frame, em segundos.
+
+        Retorna:
+        evento -- EventoPiscada encerrado neste frame, ou None.
+        """
+        if self._primeiro_timestamp is None:
+            self._primeiro_timestamp = timestamp
+        if ear is None:
+            return None
+
+        if ear < self.ear_threshold:
+            if self.inicio is None:
+                self.inicio = timestamp
+                self.ear_minimo = ear
+            else:
+                self.ear_minimo = min(self.ear_minimo, ear)
+            return None
+
+        if self.inicio is None:
+            return None
+        duracao = timestamp - self.inicio
+        evento = EventoPiscada(self.inicio, timestamp, duracao, self.ear_minimo,
+                               TIPO_FECHAMENTO if duracao >= self.limite_piscada else TIPO_PISCADA)
+        self.inicio = None
+        self.ear_minimo = None
+        self._registrar(evento)
+        return evento
+
+    def _registrar(self, evento):
+        fator = self._fator(evento.fim)
+        self._peso = self._peso * fator + 1.0
+        self._soma_duracao = self._soma_duracao * fator + evento.duracao
+        self._instante = evento.fim
+        self.eventos += 1
+
+    def _fator(self, timestamp):
+        # Fator de decaimento entre o último evento e o instante informado.
+        if self._instante is None or timestamp <= self._instante:
+            return 1.0
+        return math.exp(-(timestamp - self._instante) / self.janela)
+
+    def duracao_media(self):
+        # Duração média ponderada dos eventos da janela; o decaimento não altera a razão.
+        return self._soma_duracao / self._peso if self._peso else 0.0
+
+    def taxa_por_minuto(self, timestamp):
+        # Número de eventos por minuto na janela. No início da sessão, o peso é normalizado pelo
+        # tempo observado, para que a taxa não fique subestimada.
+        if self._primeiro_timestamp is None or timestamp <= self._primeiro_timestamp:
+            return 0.0
+        observado = self.janela * (1.0 - math.exp(-(timestamp - self._primeiro_timestamp) / self.janela))
+        return self._peso * self._fator(timestamp) / observado * 60
@@ -0,0 +1,99 @@
+# buffers.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import gc
+import tracemalloc
+
+import cv2
+import numpy as np
+
+# Descrição:
+# Este script implementa o modo de buffers pré-alocados do loop de frames.
+# O frame BGR, a imagem em escala de cinza e os arrays de pontos faciais são alocados uma única
+# vez e reutilizados em todos os frames, por meio dos parâmetros de saída do OpenCV
+# (VideoCapture.read(image=...) e cv2.cvtColor(..., dst=...)); o overlay é desenhado sobre o
+# próprio frame reutilizado. O ContadorMemoria mede os bytes alocados (com o tracemalloc) e as
+# coletas do GC por frame, permitindo confirmar que a alocação em regime permanente fica próxima
+# de zero.
+#
+# Como os mesmos buffers são sobrescritos a cada frame, o modo só deve ser usado no loop
+# sequencial, em que o resultado de um frame é consumido antes da leitura do próximo.
+
+
+class FramePool:
+    def __init__(self):
+        self.frame = None
+        self.gray = None
+        self._landmarks = []
+
+    def ler(self, video):
+        # Lê o próximo frame no buffer reutilizado (alocado na primeira leitura).
+        ret, frame = video.read(self.frame)
+        if ret:
+            self.frame = frame
+        return ret, frame
+
+    def cinza(self, frame):
+        # Converte o frame para escala de cinza no buffer reutilizado.
+        altura, largura = frame.shape[:2]
+        if self.gray is None or self.gray.shape != (altura, largura):
+            self.gray = np.empty((altura, largura), dtype=np.uint8)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
+
+    def landmarks(self, indice, num_pontos=68):
+        # Retorna o array (num_pontos, 2) reutilizado para a face de índice informado.
+        while len(self._landmarks) <= indice:
+            self._landmarks.append(np.empty((num_pontos, 2), dtype=np.int32))
+        if self._landmarks[indice].shape[0] != num_pontos:
+            self._landmarks[indice] = np.empty((num_pontos, 2), dtype=np.int32)
+        return self._landmarks[indice]
+
+# Mede a alocação de memória e as coletas do GC a cada frame.
+# A cada frame, o pico do tracemalloc é reiniciado; o pico menos a memória no início do frame é
+# o maior volume alocado ao mesmo tempo durante o frame, incluindo os dados dos arrays NumPy e a
+# memória temporária liberada no próprio frame, que a variação de blocos entre frames não mostra.
+
+
+class ContadorMemoria:
+    def __init__(self):
+        # O tracemalloc deixa o loop mais lento; só é usado quando a medição é pedida.
+        self._iniciou_tracemalloc = not tracemalloc.is_tracing()
+        if self._iniciou_tracemalloc:
+            tracemalloc.start()
+        self.frames = 0
+        self.coletas = 0
+        # Bytes alocados (pico acima do início do frame) no último frame.
+        self.bytes_frame = 0
+        # Soma dos bytes alocados por frame desde o início, usada na média por frame.
+        self.bytes_total = 0
+        self._bytes_inicio = None
+        gc.callbacks.append(self._callback_gc)
+
+    def _callback_gc(self, fase, info):
+        if fase == "stop":
+            self.coletas += 1
+
+    def frame(self):
+        # Registra o fim de um frame e o início do próximo.
+        atual, pico = tracemalloc.get_traced_memory()
+        if self._bytes_inicio is not None:
+            self.bytes_frame = max(0, pico - self._bytes_inicio)
+            self.bytes_total += self.bytes_frame
+            self.frames += 1
+        tracemalloc.reset_peak()
+        self._bytes_inicio = atual
+
+    @property
+    def bytes_por_frame(self):
+        return self.bytes_total / self.frames if self.frames else 0.0
+
+    def valores(self):
+        return {"frames": self.frames, "bytes_por_frame": self.bytes_por_frame,
+                "bytes_ultimo_frame": self.bytes_frame, "coletas_gc": self.coletas}
+
+    def linha_overlay(self):
+        return f"Alocado/frame: {self.bytes_por_frame / 1024:.1f} KB  GC: {self.coletas}"
+
+    def fechar(self):
+        gc.callbacks.remove(self._callback_gc)
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
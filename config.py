@@ -1,29 +1,684 @@
+import logging
+import os
+import threading
 from configparser import ConfigParser
+from typing import NamedTuple, Optional, Tuple
 
-# Inicializa o objeto ConfigParser para ler o arquivo 'config.ini'
-config = ConfigParser()
-config.read('config.ini')
+# Descrição:
+# Configuração do sistema, lida de config.ini uma única vez e guardada em um objeto Settings
+# tipado e imutável, validado na leitura. Os getters abaixo apenas retornam campos do objeto
+# atual, sem reprocessar o arquivo. Cada valor pode ser sobrescrito por uma variável de ambiente
+# (SONOLENCIA_<CHAVE>, por exemplo SONOLENCIA_EAR_THRESHOLD=0.22) ou pela linha de comando
+# (--set CHAVE=VALOR). Com CONFIG_RELOAD_INTERVAL > 0, o arquivo é monitorado e, quando muda, um
+# novo objeto é lido, validado e trocado de uma só vez; os motores em execução aplicam os novos
+# limiares entre dois frames, sem reiniciar o processo nem recarregar o preditor.
+
+# Arquivo de configuração: SONOLENCIA_CONFIG, ou o config.ini ao lado deste módulo.
+CAMINHO_CONFIG = os.environ.get(
+    'SONOLENCIA_CONFIG', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini'))
+
+# Prefixo das variáveis de ambiente que sobrescrevem os valores do arquivo.
+PREFIXO_AMBIENTE = 'SONOLENCIA_'
+
+# Número de níveis do escalonador de qualidade (quality_scheduler.NIVEIS).
+NIVEIS_QUALIDADE = 5
+
+logger = logging.getLogger("config")
+
+# Valores da configuração. Cada campo corresponde à chave de mesmo nome, em maiúsculas, na seção
+# [settings] do config.ini; os campos sem valor padrão são obrigatórios.
+
+
+class Settings(NamedTuple):
+    predictor_path: str
+    sound_file_path: str
+    ear_threshold: float
+    tempo_alerta: float
+    drowsiness_percentage: float = 30.0
+    perclos_window: float = 60.0
+    perclos_min_window: float = 1.0
+    blink_duration_limit: float = 0.4
+    blink_window: float = 60.0
+    tracking_enabled: bool = False
+    detection_interval: int = 10
+    detection_scale: float = 0.5
+    tracking_method: str = 'correlation'
+    tracking_min_confidence: float = 7.0
+    pipeline_enabled: bool = False
+    capture_buffer_size: int = 2
+    display_max_fps: float = 30.0
+    face_detector_backend: str = 'dlib_hog'
+    haar_cascade_path: Optional[str] = None
+    dnn_model_path: str = ''
+    dnn_config_path: Optional[str] = None
+    dnn_confidence: float = 0.5
+    alert_sinks: Tuple[str, ...] = ('som',)
+    alert_debounce: float = 0.0
+    alert_min_interval: float = 5.0
+    alert_udp_address: Tuple[str, int] = ('127.0.0.1', 9999)
+    alert_http_url: str = ''
+    video_sources: tuple = (0,)
+    server_workers: int = 2
+    server_report_interval: float = 10.0
+    buffer_pool_enabled: bool = False
+    landmark_gate_enabled: bool = False
+    landmark_gate_threshold: float = 4.0
+    landmark_gate_max_age: float = 0.2
+    driver_selection_enabled: bool = True
+    driver_selection_criterion: str = 'largest'
+    driver_region: Tuple[float, float, float, float] = (0.0, 0.0, 1.0, 1.0)
+    driver_track_min_iou: float = 0.3
+    quality_scheduler_enabled: bool = False
+    quality_latency_budget: float = 0.1
+    quality_headroom: float = 0.6
+    quality_initial_level: int = 1
+    render_mode: Tuple[str, ...] = ('preview',)
+    render_preview_scale: float = 1.0
+    render_record_path: str = 'gravacao.avi'
+    render_record_codec: str = 'MJPG'
+    render_record_fps: float = 0.0
+    metrics_server_enabled: bool = False
+    metrics_server_address: Tuple[str, int] = ('127.0.0.1', 9100)
+    metrics_push_interval: float = 1.0
+    config_reload_interval: float = 2.0
+
+# Conversões dos textos do arquivo para os tipos de cada campo.
+
+
+def _booleano(texto):
+    valor = texto.strip().lower()
+    if valor in ('1', 'yes', 'true', 'on'):
+        return True
+    if valor in ('0', 'no', 'false', 'off'):
+        return False
+    raise ValueError(f"valor booleano inválido: {texto!r}")
+
+
+def _opcional(texto):
+    return texto.strip() or None
+
+
+def _lista(texto):
+    return tuple(item.strip().lower() for item in texto.split(',') if item.strip())
+
+
+def _endereco(texto):
+    host, porta = texto.strip().rsplit(':', 1)
+    return host, int(porta)
+
+
+def _fontes_video(texto):
+    # Índices de câmera viram int; os demais valores são arquivos ou URLs.
+    fontes = (fonte.strip() for fonte in texto.split(','))
+    return tuple(int(fonte) if fonte.isdigit() else fonte for fonte in fontes if fonte)
+
+
+def _regiao(texto):
+    valores = tuple(float(valor) for valor in texto.split(','))
+    if len(valores) != 4:
+        raise ValueError("esperados quatro valores x1,y1,x2,y2")
+    return valores
+
+
+_CONVERSORES_TIPO = {str: str.strip, float: float, int: int, bool: _booleano,
+                     Optional[str]: _opcional}
+
+_CONVERSORES_CAMPO = {
+    'alert_sinks': _lista,
+    'render_mode': _lista,
+    'alert_udp_address': _endereco,
+    'metrics_server_address': _endereco,
+    'video_sources': _fontes_video,
+    'driver_region': _regiao,
+    'tracking_method': lambda texto: texto.strip().lower(),
+    'face_detector_backend': lambda texto: texto.strip().lower(),
+    'driver_selection_criterion': lambda texto: texto.strip().lower(),
+}
+
+
+def _converter(campo, texto):
+    conversor = _CONVERSORES_CAMPO.get(campo) or _CONVERSORES_TIPO[Settings.__annotations__[campo]]
+    try:
+        return conversor(texto)
+    except ValueError as erro:
+        raise ValueError(f"Valor inválido para {campo.upper()}: {texto!r} ({erro})")
+
+# Regras verificadas uma única vez, na leitura da configuração.
+
+
+def _validar(settings):
+    erros = []
+
+    def exigir(condicao, mensagem):
+        if not condicao:
+            erros.append(mensagem)
+
+    exigir(0 < settings.ear_threshold < 1, "EAR_THRESHOLD deve estar entre 0 e 1")
+    exigir(settings.tempo_alerta > 0, "TEMPO_ALERTA deve ser positivo")
+    exigir(0 <= settings.drowsiness_percentage <= 100, "DROWSINESS_PERCENTAGE deve estar entre 0 e 100")
+    exigir(settings.perclos_window > 0, "PERCLOS_WINDOW deve ser positivo")
+    exigir(settings.perclos_min_window >= 0, "PERCLOS_MIN_WINDOW não pode ser negativo")
+    exigir(settings.blink_duration_limit > 0, "BLINK_DURATION_LIMIT deve ser positivo")
+    exigir(settings.blink_window > 0, "BLINK_WINDOW deve ser positivo")
+    exigir(settings.detection_interval >= 1, "DETECTION_INTERVAL deve ser ao menos 1")
+    exigir(0 < settings.detection_scale <= 1, "DETECTION_SCALE deve estar entre 0 e 1")
+    exigir(settings.tracking_method in ('correlation', 'landmarks'),
+           "TRACKING_METHOD deve ser correlation ou landmarks")
+    exigir(settings.capture_buffer_size >= 1, "CAPTURE_BUFFER_SIZE deve ser ao menos 1")
+    exigir(settings.display_max_fps > 0, "DISPLAY_MAX_FPS deve ser positivo")
+    exigir(settings.face_detector_backend in ('dlib_hog', 'haar', 'dnn'),
+           "FACE_DETECTOR_BACKEND deve ser dlib_hog, haar ou dnn")
+    exigir(settings.face_detector_backend != 'dnn' or settings.dnn_model_path,
+           "DNN_MODEL_PATH é obrigatório com FACE_DETECTOR_BACKEND=dnn")
+    exigir(0 <= settings.dnn_confidence <= 1, "DNN_CONFIDENCE deve estar entre 0 e 1")
+    exigir(set(settings.alert_sinks) <= {'som', 'log', 'udp', 'http'},
+           "ALERT_SINKS aceita apenas som, log, udp e http")
+    exigir('http' not in settings.alert_sinks or settings.alert_http_url,
+           "ALERT_HTTP_URL é obrigatório com o destino http")
+    exigir(settings.alert_debounce >= 0 and settings.alert_min_interval >= 0,
+           "ALERT_DEBOUNCE e ALERT_MIN_INTERVAL não podem ser negativos")
+    exigir(settings.video_sources, "VIDEO_SOURCES deve ter ao menos uma fonte")
+    exigir(settings.server_workers >= 1, "SERVER_WORKERS deve ser ao menos 1")
+    exigir(settings.landmark_gate_threshold >= 0, "LANDMARK_GATE_THRESHOLD não pode ser negativo")
+    exigir(settings.landmark_gate_max_age >= 0, "LANDMARK_GATE_MAX_AGE não pode ser negativo")
+    exigir(settings.driver_selection_criterion in ('largest', 'region'),
+           "DRIVER_SELECTION_CRITERION deve ser largest ou region")
+    exigir(all(0 <= valor <= 1 for valor in settings.driver_region),
+           "DRIVER_REGION deve ter coordenadas relativas entre 0 e 1")
+    x1, y1, x2, y2 = settings.driver_region
+    exigir(x1 < x2 and y1 < y2, "DRIVER_REGION deve ter x1 < x2 e y1 < y2")
+    exigir(0 <= settings.driver_track_min_iou <= 1, "DRIVER_TRACK_MIN_IOU deve estar entre 0 e 1")
+    exigir(settings.quality_latency_budget > 0, "QUALITY_LATENCY_BUDGET deve ser positivo")
+    exigir(0 < settings.quality_headroom < 1, "QUALITY_HEADROOM deve estar entre 0 e 1")
+    exigir(0 <= settings.quality_initial_level < NIVEIS_QUALIDADE,
+           f"QUALITY_INITIAL_LEVEL deve estar entre 0 e {NIVEIS_QUALIDADE - 1}")
+    exigir(set(settings.render_mode) <= {'off', 'preview', 'record'},
+           "RENDER_MODE aceita apenas off, preview e record")
+    exigir(0 < settings.render_preview_scale <= 1, "RENDER_PREVIEW_SCALE deve estar entre 0 e 1")
+    exigir(len(settings.render_record_codec) == 4, "RENDER_RECORD_CODEC deve ter quatro caracteres")
+    exigir(settings.render_record_fps >= 0, "RENDER_RECORD_FPS não pode ser negativo")
+    exigir(settings.metrics_push_interval > 0, "METRICS_PUSH_INTERVAL deve ser positivo")
+    exigir(settings.config_reload_interval >= 0, "CONFIG_RELOAD_INTERVAL não pode ser negativo")
+
+    if erros:
+        raise ValueError("Configuração inválida: " + "; ".join(erros))
+
+# Lê, converte e valida a configuração. A prioridade é: linha de comando, variáveis de ambiente,
+# arquivo e, por fim, os valores padrão do Settings.
+
+
+def carregar_configuracao(caminho=None, sobrescritas=None, ambiente=None):
+    """
+    Lê a configuração do arquivo e aplica as sobrescritas.
+
+    Argumentos:
+    caminho -- Caminho do config.ini (padrão: CAMINHO_CONFIG).
+    sobrescritas -- Dicionário {CHAVE: valor em texto} vindo da linha de comando.
+    ambiente -- Variáveis de ambiente (padrão: os.environ).
+
+    Retorna:
+    settings -- Objeto Settings validado.
+    """
+    parser = ConfigParser()
+    parser.read(caminho or CAMINHO_CONFIG, encoding='utf-8')
+    textos = dict(parser['settings']) if parser.has_section('settings') else {}
+
+    ambiente = os.environ if ambiente is None else ambiente
+    for campo in Settings._fields:
+        variavel = PREFIXO_AMBIENTE + campo.upper()
+        if variavel in ambiente:
+            textos[campo] = ambiente[variavel]
+    for chave, texto in (sobrescritas or {}).items():
+        if chave.lower() not in Settings._fields:
+            raise ValueError(f"Chave de configuração desconhecida: {chave}")
+        textos[chave.lower()] = texto
+
+    valores = {}
+    for campo in Settings._fields:
+        if campo in textos:
+            valores[campo] = _converter(campo, textos[campo])
+        elif campo not in Settings._field_defaults:
+            raise ValueError(f"Chave obrigatória ausente na configuração: {campo.upper()}")
+    settings = Settings(**valores)
+    _validar(settings)
+    return settings
+
+
+# Configuração atual, trocada de uma só vez a cada recarga, e a sua versão.
+_atual = None
+_versao = 0
+_sobrescritas = {}
+_trava = threading.Lock()
+_monitor = None
+
+# Retorna a configuração atual, lendo o arquivo apenas na primeira chamada.
+
+
+def obter_configuracao():
+    settings = _atual
+    if settings is None:
+        with _trava:
+            if _atual is None:
+                _trocar(carregar_configuracao(sobrescritas=_sobrescritas))
+            settings = _atual
+    return settings
+
+
+def _trocar(settings):
+    global _atual, _versao
+    _atual = settings
+    _versao += 1
+
+# Número incrementado a cada troca da configuração; permite aplicar uma recarga entre dois frames.
+
+
+def versao_configuracao():
+    return _versao
+
+# Lê novamente o arquivo. Se a nova configuração for inválida, a atual é mantida e o erro propagado.
+
+
+def recarregar_configuracao():
+    settings = carregar_configuracao(sobrescritas=_sobrescritas)
+    with _trava:
+        _trocar(settings)
+    return settings
+
+# Sobrescreve valores da configuração, como os recebidos por --set CHAVE=VALOR. As sobrescritas
+# (e o arquivo escolhido) só passam a valer se a nova configuração for válida; caso contrário,
+# a atual é mantida e o erro propagado.
+
+
+def sobrescrever_configuracao(pares, caminho=None):
+    sobrescritas = dict(_sobrescritas)
+    for par in pares:
+        chave, separador, texto = par.partition('=')
+        if not separador:
+            raise ValueError(f"Use CHAVE=VALOR: {par}")
+        sobrescritas[chave.strip().upper()] = texto
+    return _aplicar_sobrescritas(sobrescritas, caminho)
+
+
+def _aplicar_sobrescritas(sobrescritas, caminho=None):
+    global CAMINHO_CONFIG
+    caminho = caminho or CAMINHO_CONFIG
+    settings = carregar_configuracao(caminho, sobrescritas)
+    with _trava:
+        CAMINHO_CONFIG = caminho
+        _sobrescritas.clear()
+        _sobrescritas.update(sobrescritas)
+        _trocar(settings)
+    return settings
+
+# Estado das sobrescritas deste processo (arquivo escolhido e valores de --set). As sobrescritas
+# ficam apenas neste módulo; os processos filhos, como os do pool do batch_analysis.py, recebem
+# esse estado explicitamente e o aplicam com restaurar_sobrescritas.
+
+
+def estado_sobrescritas():
+    return CAMINHO_CONFIG, dict(_sobrescritas)
+
+
+def restaurar_sobrescritas(estado):
+    caminho, sobrescritas = estado
+    return _aplicar_sobrescritas(dict(sobrescritas), caminho)
+
+# Adiciona a um argparse as opções --config e --set, comuns a todas as ferramentas de linha de comando.
+
+
+def adicionar_argumentos_configuracao(parser):
+    parser.add_argument("--config", help="Arquivo de configuração (padrão: config.ini).")
+    parser.add_argument("--set", dest="sobrescritas", action="append", default=[],
+                        metavar="CHAVE=VALOR", help="Sobrescreve um valor do config.ini.")
+
+
+def aplicar_argumentos_configuracao(args):
+    if args.config or args.sobrescritas:
+        sobrescrever_configuracao(args.sobrescritas,
+                                  os.path.abspath(args.config) if args.config else None)
+
+# Monitora o arquivo de configuração e o recarrega quando ele é alterado.
+
+
+class ConfigWatcher(threading.Thread):
+    def __init__(self, caminho, intervalo=2.0):
+        super().__init__(name="monitor-config", daemon=True)
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._assinatura = self._ler_assinatura()
+
+    def _ler_assinatura(self):
+        try:
+            estado = os.stat(self.caminho)
+        except OSError:
+            return None
+        return estado.st_mtime_ns, estado.st_size
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            assinatura = self._ler_assinatura()
+            if assinatura is None or assinatura == self._assinatura:
+                continue
+            self._assinatura = assinatura
+            try:
+                recarregar_configuracao()
+                logger.warning("Configuração recarregada de %s", self.caminho)
+            except (ValueError, OSError) as erro:
+                # Um arquivo inválido (por exemplo, salvo pela metade) não derruba o processo.
+                logger.error("Configuração mantida: %s", erro)
+
+    def parar(self):
+        self._parar.set()
+
+# Inicia o monitoramento do arquivo de configuração, se CONFIG_RELOAD_INTERVAL > 0.
+
+
+def iniciar_recarga_automatica():
+    global _monitor
+    intervalo = obter_configuracao().config_reload_interval
+    if intervalo <= 0 or _monitor is not None:
+        return _monitor
+    _monitor = ConfigWatcher(CAMINHO_CONFIG, intervalo)
+    _monitor.start()
+    return _monitor
 
 # Obtém o caminho do preditor facial no arquivo de configuração
 
 
 def get_predictor_path():
-    return config.get('settings', 'PREDICTOR_PATH')
+    return obter_configuracao().predictor_path
 
 # Obtém o caminho do arquivo de som no arquivo de configuração
 
 
 def get_sound_file_path():
-    return config.get('settings', 'SOUND_FILE_PATH')
+    return obter_configuracao().sound_file_path
 
 # Obtém o valor do limiar EAR (Eye Aspect Ratio) no arquivo de configuração
 
 
 def get_ear_threshold():
-    return config.getfloat('settings', 'EAR_THRESHOLD')
+    return obter_configuracao().ear_threshold
 
 # Obtém o valor do tempo de alerta no arquivo de configuração
 
 
 def get_tempo_alerta():
-    return config.getfloat('settings', 'TEMPO_ALERTA')
+    return obter_configuracao().tempo_alerta
+
+# Indica se o modo de rastreamento da face está ativado
+
+
+def get_tracking_enabled():
+    return obter_configuracao().tracking_enabled
+
+# Obtém o número de frames entre duas detecções completas de face
+
+
+def get_detection_interval():
+    return obter_configuracao().detection_interval
+
+# Obtém o fator de redução do frame usado na detecção de faces
+
+
+def get_detection_scale():
+    return obter_configuracao().detection_scale
+
+# Obtém o método de rastreamento usado entre as detecções (correlation ou landmarks)
+
+
+def get_tracking_method():
+    return obter_configuracao().tracking_method
+
+# Obtém a confiança mínima do rastreador antes de uma nova detecção
+
+
+def get_tracking_min_confidence():
+    return obter_configuracao().tracking_min_confidence
+
+# Indica se o pipeline com threads (captura, inferência e exibição) está ativado
+
+
+def get_pipeline_enabled():
+    return obter_configuracao().pipeline_enabled
+
+# Obtém a capacidade do buffer entre a captura e a inferência
+
+
+def get_capture_buffer_size():
+    return obter_configuracao().capture_buffer_size
+
+# Obtém a taxa máxima de exibição dos frames processados
+
+
+def get_display_max_fps():
+    return obter_configuracao().display_max_fps
+
+# Obtém o backend de detecção de faces (dlib_hog, haar ou dnn)
+
+
+def get_face_detector_backend():
+    return obter_configuracao().face_detector_backend
+
+# Obtém o caminho do Haar cascade (None usa o cascade padrão do OpenCV)
+
+
+def get_haar_cascade_path():
+    return obter_configuracao().haar_cascade_path
+
+# Obtém o caminho do modelo do detector DNN
+
+
+def get_dnn_model_path():
+    return obter_configuracao().dnn_model_path
+
+# Obtém o caminho do arquivo de configuração do detector DNN
+
+
+def get_dnn_config_path():
+    return obter_configuracao().dnn_config_path
+
+# Obtém a confiança mínima de uma detecção do modelo DNN
+
+
+def get_dnn_confidence():
+    return obter_configuracao().dnn_confidence
+
+# Obtém a lista de destinos dos alertas (som, log, udp, http)
+
+
+def get_alert_sinks():
+    return obter_configuracao().alert_sinks
+
+# Obtém o tempo de debounce dos alertas
+
+
+def get_alert_debounce():
+    return obter_configuracao().alert_debounce
+
+# Obtém o intervalo mínimo entre dois alertas
+
+
+def get_alert_min_interval():
+    return obter_configuracao().alert_min_interval
+
+# Obtém o endereço (host, porta) do notificador UDP
+
+
+def get_alert_udp_address():
+    return obter_configuracao().alert_udp_address
+
+# Obtém a URL do notificador HTTP
+
+
+def get_alert_http_url():
+    return obter_configuracao().alert_http_url
+
+# Obtém a duração da janela deslizante do PERCLOS
+
+
+def get_perclos_window():
+    return obter_configuracao().perclos_window
+
+# Obtém as fontes de vídeo do servidor multicâmera (índices de câmera viram int)
+
+
+def get_video_sources():
+    return obter_configuracao().video_sources
+
+# Obtém o número de threads de inferência do servidor multicâmera
+
+
+def get_server_workers():
+    return obter_configuracao().server_workers
+
+# Obtém o intervalo entre os relatórios do servidor multicâmera
+
+
+def get_server_report_interval():
+    return obter_configuracao().server_report_interval
+
+# Indica se o modo de buffers pré-alocados está ativado
+
+
+def get_buffer_pool_enabled():
+    return obter_configuracao().buffer_pool_enabled
+
+# Indica se o portão de movimento dos pontos faciais está ativado
+
+
+def get_landmark_gate_enabled():
+    return obter_configuracao().landmark_gate_enabled
+
+# Obtém o limiar de diferença do portão de movimento
+
+
+def get_landmark_gate_threshold():
+    return obter_configuracao().landmark_gate_threshold
+
+# Obtém o tempo máximo de reutilização dos pontos faciais
+
+
+def get_landmark_gate_max_age():
+    return obter_configuracao().landmark_gate_max_age
+
+# Indica se a seleção do motorista está ativada
+
+
+def get_driver_selection_enabled():
+    return obter_configuracao().driver_selection_enabled
+
+# Obtém o critério de escolha da face do motorista
+
+
+def get_driver_selection_criterion():
+    return obter_configuracao().driver_selection_criterion
+
+# Obtém a região da cabine (x1, y1, x2, y2), relativa ao tamanho do frame
+
+
+def get_driver_region():
+    return obter_configuracao().driver_region
+
+# Obtém a sobreposição mínima para manter a face do motorista
+
+
+def get_driver_track_min_iou():
+    return obter_configuracao().driver_track_min_iou
+
+# Indica se o escalonador adaptativo de qualidade está ativado
+
+
+def get_quality_scheduler_enabled():
+    return obter_configuracao().quality_scheduler_enabled
+
+# Obtém o orçamento de latência por frame, em segundos
+
+
+def get_quality_latency_budget():
+    return obter_configuracao().quality_latency_budget
+
+# Obtém a fração do orçamento abaixo da qual a qualidade volta a subir
+
+
+def get_quality_headroom():
+    return obter_configuracao().quality_headroom
+
+# Obtém o nível de qualidade inicial
+
+
+def get_quality_initial_level():
+    return obter_configuracao().quality_initial_level
+
+# Obtém os modos de renderização (off, preview, record)
+
+
+def get_render_mode():
+    return obter_configuracao().render_mode
+
+# Obtém o fator de redução da pré-visualização
+
+
+def get_render_preview_scale():
+    return obter_configuracao().render_preview_scale
+
+# Obtém o arquivo da gravação do vídeo anotado
+
+
+def get_render_record_path():
+    return obter_configuracao().render_record_path
+
+# Obtém o codec (FourCC) da gravação
+
+
+def get_render_record_codec():
+    return obter_configuracao().render_record_codec
+
+# Obtém a taxa de quadros da gravação (0 usa a da fonte de vídeo)
+
+
+def get_render_record_fps():
+    return obter_configuracao().render_record_fps
+
+# Indica se o servidor local de métricas está ativado
+
+
+def get_metrics_server_enabled():
+    return obter_configuracao().metrics_server_enabled
+
+# Obtém o endereço (host, porta) do servidor de métricas
+
+
+def get_metrics_server_address():
+    return obter_configuracao().metrics_server_address
+
+# Obtém o intervalo entre as amostras e os envios do servidor de métricas
+
+
+def get_metrics_push_interval():
+    return obter_configuracao().metrics_push_interval
+
+# Obtém a porcentagem de PERCLOS acima da qual o motorista é considerado sonolento
+
+
+def get_drowsiness_percentage():
+    return obter_configuracao().drowsiness_percentage
+
+# Obtém o tempo mínimo de observação antes que o PERCLOS possa disparar o alerta
+
+
+def get_perclos_min_window():
+    return obter_configuracao().perclos_min_window
+
+# Obtém a duração média das piscadas acima da qual a sonolência é sinalizada
+
+
+def get_blink_duration_limit():
+    return obter_configuracao().blink_duration_limit
+
+# Obtém a constante de tempo da janela das estatísticas de piscadas
+
+
+def get_blink_window():
+    return obter_configuracao().blink_window
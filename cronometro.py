@@ -0,0 +1,53 @@
+# cronometro.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Descrição:
+# Este script mede o tempo gasto em cada etapa do processamento de um frame
+# (captura, conversão para cinza, detecção de faces, shape_predictor, EAR, overlay e alerta).
+# O motor unificado registra as suas etapas em um StageTimer; o benchmark guarda todas as
+# amostras para calcular os percentis de latência de cada etapa.
+
+# Percentis de latência reportados pelo benchmark.
+PERCENTIS = (50, 95, 99)
+
+
+class StageTimer:
+    def __init__(self, guardar_amostras=False):
+        # Duração (em segundos) da última execução de cada etapa.
+        self.ultimas = {}
+        # Quando ativado, guarda a duração de todas as execuções de cada etapa.
+        self.guardar_amostras = guardar_amostras
+        self.amostras = {}
+
+    @contextmanager
+    def etapa(self, nome):
+        # Mede o tempo do bloco "with cronometro.etapa(nome):".
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nome, time.perf_counter() - inicio)
+
+    def registrar(self, nome, duracao):
+        self.ultimas[nome] = duracao
+        if self.guardar_amostras:
+            self.amostras.setdefault(nome, []).append(duracao)
+
+    def resumo(self):
+        """
+        Resume as amostras guardadas de cada etapa.
+
+        Retorna:
+        resumo -- Dicionário {etapa: {"n", "media_ms", "p50_ms", "p95_ms", "p99_ms"}}.
+        """
+        resumo = {}
+        for nome, amostras in self.amostras.items():
+            milissegundos = np.asarray(amostras) * 1000
+            resumo[nome] = {"n": len(amostras), "media_ms": float(milissegundos.mean())}
+            for percentil, valor in zip(PERCENTIS, np.percentile(milissegundos, PERCENTIS)):
+                resumo[nome][f"p{percentil}_ms"] = float(valor)
+        return resumo
@@ -0,0 +1,98 @@
+# driver_selector.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+from config import get_driver_selection_enabled, get_driver_selection_criterion
+from config import get_driver_region, get_driver_track_min_iou
+
+# Descrição:
+# Este script implementa a seleção do motorista entre as faces localizadas no frame.
+# Apenas a face escolhida passa pelo shape_predictor e alimenta as métricas, de modo que
+# passageiros ou pessoas do lado de fora do veículo não gastam chamadas ao preditor nem
+# corrompem as estatísticas de sonolência. A face é escolhida pelo maior tamanho ou pela
+# proximidade da região da cabine configurada (DRIVER_REGION) e, uma vez escolhida, é mantida
+# enquanto houver no frame uma face que continue a caixa anterior (sobreposição mínima).
+
+CRITERIO_MAIOR = "largest"
+CRITERIO_REGIAO = "region"
+
+
+class DriverSelector:
+    def __init__(self, criterio=CRITERIO_MAIOR, regiao=(0.0, 0.0, 1.0, 1.0), iou_minimo=0.3):
+        if criterio not in (CRITERIO_MAIOR, CRITERIO_REGIAO):
+            raise ValueError(f"Critério de seleção do motorista desconhecido: {criterio}")
+        self.criterio = criterio
+        # Região da cabine (x1, y1, x2, y2), em coordenadas relativas ao frame (0 a 1).
+        self.regiao = regiao
+        # Sobreposição (IoU) mínima para que uma face continue a caixa do motorista anterior;
+        # 0 desativa a continuidade e a face é escolhida novamente a cada frame.
+        self.iou_minimo = iou_minimo
+        self.motorista = None
+        # Contador de faces descartadas, que deixaram de passar pelo preditor.
+        self.ignoradas = 0
+
+    def __call__(self, faces, forma):
+        """
+        Escolhe a face do motorista.
+
+        Argumentos:
+        faces -- Lista de dlib.rectangle localizados no frame.
+        forma -- Forma (altura, largura) do frame.
+
+        Retorna:
+        faces -- Lista com a face do motorista, ou vazia se não houver faces.
+        """
+        if not faces:
+            self.motorista = None
+            return []
+
+        escolhida = None
+        if self.motorista is not None and self.iou_minimo > 0:
+            iou, face = max(((self._iou(face, self.motorista), face) for face in faces),
+                            key=lambda item: item[0])
+            if iou >= self.iou_minimo:
+                escolhida = face
+        if escolhida is None:
+            if self.criterio == CRITERIO_REGIAO:
+                escolhida = min(faces, key=lambda face: self._distancia_regiao(face, forma))
+            else:
+                escolhida = max(faces, key=lambda face: face.area())
+
+        self.ignoradas += len(faces) - 1
+        self.motorista = escolhida
+        return [escolhida]
+
+    def zerar(self):
+        # Descarta a contagem anterior (por exemplo, a do aquecimento de um benchmark).
+        self.ignoradas = 0
+
+    def valores(self):
+        return {"faces_ignoradas": self.ignoradas}
+
+    def _distancia_regiao(self, face, forma):
+        # Distância (ao quadrado, em pixels) entre o centro da face e o centro da região.
+        altura, largura = forma[:2]
+        x1, y1, x2, y2 = self.regiao
+        centro_x = (x1 + x2) / 2 * largura
+        centro_y = (y1 + y2) / 2 * altura
+        face_x = (face.left() + face.right()) / 2
+        face_y = (face.top() + face.bottom()) / 2
+        return (face_x - centro_x) ** 2 + (face_y - centro_y) ** 2
+
+    @staticmethod
+    def _iou(a, b):
+        largura = min(a.right(), b.right()) - max(a.left(), b.left())
+        altura = min(a.bottom(), b.bottom()) - max(a.top(), b.top())
+        if largura <= 0 or altura <= 0:
+            return 0.0
+        intersecao = largura * altura
+        area_a = (a.right() - a.left()) * (a.bottom() - a.top())
+        area_b = (b.right() - b.left()) * (b.bottom() - b.top())
+        return intersecao / (area_a + area_b - intersecao)
+
+# Cria o seletor do motorista, se ativado no arquivo de configuração.
+
+
+def criar_seletor_motorista():
+    if not get_driver_selection_enabled():
+        return None
+    return DriverSelector(get_driver_selection_criterion(), get_driver_region(),
+                          get_driver_track_min_iou())
@@ -0,0 +1,164 @@
+# face_detectors.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import time
+
+import cv2
+import dlib
+from config import get_face_detector_backend, get_haar_cascade_path
+from config import get_dnn_model_path, get_dnn_config_path, get_dnn_confidence
+
+# Descrição:
+# Este script define os backends de detecção de faces que podem ser escolhidos no config.ini
+# (FACE_DETECTOR_BACKEND): o detector HOG do dlib, um Haar cascade do OpenCV e um detector DNN
+# do OpenCV carregado de um arquivo de modelo local. Todos recebem um frame em escala de cinza
+# e retornam uma lista de dlib.rectangle, que pode ser usada diretamente pelo shape_predictor.
+# Cada backend mede o seu próprio tempo de detecção, permitindo escolher o mais rápido que
+# seja bom o suficiente para cada tipo de hardware.
+
+BACKEND_DLIB_HOG = "dlib_hog"
+BACKEND_HAAR = "haar"
+BACKEND_DNN = "dnn"
+
+# Classe base dos backends de detecção de faces.
+
+
+class FaceDetectorBackend:
+    nome = ""
+
+    def __init__(self):
+        self.chamadas = 0
+        self.tempo_total = 0.0
+        self.ultimo_tempo = 0.0
+
+    def __call__(self, gray, frame=None):
+        """
+        Detecta as faces em um frame em escala de cinza e mede o tempo gasto.
+
+        Argumentos:
+        gray -- Frame em escala de cinza.
+        frame -- Frame BGR original, na mesma resolução de gray (opcional). Só é usado pelos
+                 backends que trabalham com cor.
+
+        Retorna:
+        faces -- Lista de dlib.rectangle com as faces detectadas.
+        """
+        inicio = time.perf_counter()
+        faces = self.detectar(gray, frame)
+        self.ultimo_tempo = time.perf_counter() - inicio
+        self.tempo_total += self.ultimo_tempo
+        self.chamadas += 1
+        return faces
+
+    def detectar(self, gray, frame=None):
+        raise NotImplementedError
+
+    @property
+    def tempo_medio(self):
+        # Tempo médio de detecção, em segundos.
+        return self.tempo_total / self.chamadas if self.chamadas else 0.0
+
+    def zerar(self):
+        # Descarta as medições anteriores (por exemplo, as do aquecimento de um benchmark).
+        self.chamadas = 0
+        self.tempo_total = 0.0
+
+    def valores(self):
+        return {"detector_chamadas": self.chamadas,
+                "detector_tempo_medio_ms": self.tempo_medio * 1000,
+                "detector_ultimo_ms": self.ultimo_tempo * 1000}
+
+# Detector HOG do dlib (dlib.get_frontal_face_detector): preciso, porém lento em VGA ou mais.
+
+
+class DlibHogDetector(FaceDetectorBackend):
+    nome = BACKEND_DLIB_HOG
+
+    def __init__(self, upsample=0):
+        super().__init__()
+        self.detector = dlib.get_frontal_face_detector()
+        self.upsample = upsample
+
+    def detectar(self, gray, frame=None):
+        return list(self.detector(gray, self.upsample))
+
+# Detector Haar cascade do OpenCV: o mais rápido, porém com mais falsos positivos.
+
+
+class HaarCascadeDetector(FaceDetectorBackend):
+    nome = BACKEND_HAAR
+
+    def __init__(self, cascade_path=None, scale_factor=1.1, min_neighbors=5, min_size=(60, 60)):
+        super().__init__()
+        if cascade_path is None:
+            cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        self.classificador = cv2.CascadeClassifier(cascade_path)
+        if self.classificador.empty():
+            raise Exception(f"Erro ao carregar o Haar cascade: {cascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+    def detectar(self, gray, frame=None):
+        caixas = self.classificador.detectMultiScale(
+            gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+            minSize=self.min_size)
+        return [dlib.rectangle(int(x), int(y), int(x + w), int(y + h)) for x, y, w, h in caixas]
+
+# Detector DNN do OpenCV (por exemplo, o SSD res10_300x300 do OpenCV), carregado de arquivos locais.
+
+
+class DnnFaceDetector(FaceDetectorBackend):
+    nome = BACKEND_DNN
+
+    # Médias BGR subtraídas da imagem na entrada do modelo res10_300x300.
+    MEDIAS = (104.0, 177.0, 123.0)
+
+    def __init__(self, model_path, config_path=None, confianca=0.5, tamanho_entrada=(300, 300)):
+        super().__init__()
+        self.rede = cv2.dnn.readNet(model_path, config_path or "")
+        self.confianca = confianca
+        self.tamanho_entrada = tamanho_entrada
+
+    def detectar(self, gray, frame=None):
+        altura, largura = gray.shape[:2]
+        # O modelo foi treinado com imagens coloridas: o frame BGR original é usado quando
+        # disponível, e o frame em escala de cinza é replicado nos três canais apenas na falta dele.
+        bgr = frame if frame is not None else cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        self.rede.setInput(cv2.dnn.blobFromImage(
+            cv2.resize(bgr, self.tamanho_entrada), 1.0, self.tamanho_entrada, self.MEDIAS))
+        deteccoes = self.rede.forward()
+
+        faces = []
+        # Cada detecção tem a forma [_, _, confiança, x1, y1, x2, y2], com coordenadas relativas.
+        for deteccao in deteccoes[0, 0]:
+            if deteccao[2] < self.confianca:
+                continue
+            faces.append(dlib.rectangle(int(max(0.0, deteccao[3]) * largura),
+                                        int(max(0.0, deteccao[4]) * altura),
+                                        int(min(1.0, deteccao[5]) * largura),
+                                        int(min(1.0, deteccao[6]) * altura)))
+        return faces
+
+# Retorna o backend de detecção de faces usado por um localizador, percorrendo os envoltórios
+# (o TrackingFaceDetector ou a caixa fixa do benchmark), ou None se não houver um backend.
+
+
+def backend_deteccao(detector):
+    while not isinstance(detector, FaceDetectorBackend):
+        detector = getattr(detector, "detector", None)
+        if detector is None:
+            return None
+    return detector
+
+# Cria o backend de detecção de faces escolhido no arquivo de configuração.
+
+
+def criar_detector_faces(backend=None):
+    backend = backend or get_face_detector_backend()
+    if backend == BACKEND_DLIB_HOG:
+        return DlibHogDetector()
+    if backend == BACKEND_HAAR:
+        return HaarCascadeDetector(get_haar_cascade_path())
+    if backend == BACKEND_DNN:
+        return DnnFaceDetector(get_dnn_model_path(), get_dnn_config_path(), get_dnn_confidence())
+    raise ValueError(f"Backend de detecção de faces desconhecido: {backend}")
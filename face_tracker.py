@@ -0,0 +1,177 @@
+# face_tracker.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import cv2
+import dlib
+from utils import MAPA_OLHOS
+from config import get_tracking_enabled, get_detection_interval, get_detection_scale
+from config import get_tracking_method, get_tracking_min_confidence
+
+# Descrição:
+# Este script implementa a localização de faces no modo "detectar uma vez e rastrear".
+# O detector de faces, que é a etapa mais cara do processamento, roda em um frame reduzido
+# apenas a cada N frames. Nos frames intermediários a face é seguida por um rastreador leve
+# (dlib.correlation_tracker) ou pela caixa dos pontos faciais do frame anterior.
+# Com o modelo compacto só dos olhos, os pontos não cobrem a face: a caixa é reposicionada pelo
+# centro e pela largura dos olhos, mantendo a posição relativa medida na última detecção.
+
+METODO_CORRELACAO = "correlation"
+METODO_LANDMARKS = "landmarks"
+
+# Margem (proporcional ao tamanho da caixa) adicionada à caixa formada pelos pontos faciais.
+MARGEM_CAIXA_LANDMARKS = 0.1
+
+
+class TrackingFaceDetector:
+    def __init__(self, detector, intervalo_deteccao=10, escala=0.5,
+                 metodo=METODO_CORRELACAO, confianca_minima=7.0):
+        if metodo not in (METODO_CORRELACAO, METODO_LANDMARKS):
+            raise ValueError(f"Método de rastreamento desconhecido: {metodo}")
+        self.detector = detector
+        self.intervalo_deteccao = max(1, intervalo_deteccao)
+        self.escala = escala
+        self.metodo = metodo
+        self.confianca_minima = confianca_minima
+        self.faces = []
+        self.rastreadores = []
+        # Posição e tamanho de cada caixa relativos aos olhos, usados com o modelo só dos olhos.
+        self.referencias_olhos = []
+        self.frames_desde_deteccao = 0
+        # Contadores usados para acompanhar quantas detecções completas foram evitadas.
+        self.deteccoes = 0
+        self.frames = 0
+
+    def __call__(self, gray, frame=None):
+        """
+        Localiza as faces em um frame em escala de cinza.
+
+        Argumentos:
+        gray -- Frame em escala de cinza, na resolução original.
+        frame -- Frame BGR original (opcional), repassado ao detector de faces nas detecções
+                 completas.
+
+        Retorna:
+        faces -- Lista de dlib.rectangle na resolução original, compatível com o shape_predictor.
+        """
+        self.frames += 1
+        self.frames_desde_deteccao += 1
+
+        # Detecta novamente quando não há face rastreada ou quando o intervalo foi atingido.
+        if not self.faces or self.frames_desde_deteccao >= self.intervalo_deteccao:
+            return self._detectar(gray, frame)
+
+        if self.metodo == METODO_CORRELACAO:
+            # Sem rastreadores para as faces atuais (o intervalo acabou de deixar de ser 1), a
+            # face é detectada novamente e os rastreadores são criados.
+            if len(self.rastreadores) != len(self.faces):
+                return self._detectar(gray, frame)
+            faces = []
+            for rastreador in self.rastreadores:
+                # Se o rastreador perder a confiança, a face é detectada novamente.
+                if rastreador.update(gray) < self.confianca_minima:
+                    return self._detectar(gray, frame)
+                faces.append(self._para_retangulo(rastreador.get_position()))
+            self.faces = faces
+
+        # No método landmarks as caixas já foram atualizadas por atualizar_formas.
+        return list(self.faces)
+
+    def atualizar_formas(self, landmarks, faces_usadas=None):
+        # Recebe os pontos faciais (arrays (68, 2) ou (12, 2)) do frame atual e, no método
+        # landmarks, usa a caixa formada por eles como posição da face no próximo frame.
+        # faces_usadas são as caixas passadas ao preditor (por padrão, as caixas localizadas).
+        if self.metodo != METODO_LANDMARKS:
+            return
+        faces_usadas = self.faces if faces_usadas is None else faces_usadas
+        # As referências relativas aos olhos são medidas no frame da detecção completa.
+        if self.frames_desde_deteccao == 0:
+            self.referencias_olhos = []
+        faces = []
+        for indice, pontos in enumerate(landmarks):
+            if len(pontos) == MAPA_OLHOS.num_pontos:
+                faces.append(self._caixa_pelos_olhos(indice, pontos, faces_usadas))
+                continue
+            (x_min, y_min), (x_max, y_max) = pontos.min(axis=0), pontos.max(axis=0)
+            margem_x = int((x_max - x_min) * MARGEM_CAIXA_LANDMARKS)
+            margem_y = int((y_max - y_min) * MARGEM_CAIXA_LANDMARKS)
+            faces.append(dlib.rectangle(int(x_min) - margem_x, int(y_min) - margem_y,
+                                        int(x_max) + margem_x, int(y_max) + margem_y))
+        self.faces = faces
+
+    def _caixa_pelos_olhos(self, indice, pontos, faces_usadas):
+        (x_min, y_min), (x_max, y_max) = pontos.min(axis=0), pontos.max(axis=0)
+        centro_x, centro_y = (x_min + x_max) / 2, (y_min + y_max) / 2
+        largura_olhos = max(1.0, float(x_max - x_min))
+        if indice >= len(self.referencias_olhos):
+            # Deslocamento do centro da caixa e tamanho da caixa, em larguras dos olhos.
+            face = faces_usadas[indice]
+            self.referencias_olhos.append((
+                ((face.left() + face.right()) / 2 - centro_x) / largura_olhos,
+                ((face.top() + face.bottom()) / 2 - centro_y) / largura_olhos,
+                face.width() / largura_olhos, face.height() / largura_olhos))
+        deslocamento_x, deslocamento_y, largura, altura = self.referencias_olhos[indice]
+        caixa_x = centro_x + deslocamento_x * largura_olhos
+        caixa_y = centro_y + deslocamento_y * largura_olhos
+        meia_largura, meia_altura = largura * largura_olhos / 2, altura * largura_olhos / 2
+        return dlib.rectangle(int(caixa_x - meia_largura), int(caixa_y - meia_altura),
+                              int(caixa_x + meia_largura), int(caixa_y + meia_altura))
+
+    def _detectar(self, gray, frame=None):
+        self.deteccoes += 1
+        self.frames_desde_deteccao = 0
+
+        # Reduz o frame antes da detecção para diminuir o custo do detector de faces.
+        if self.escala != 1.0:
+            pequeno = cv2.resize(gray, None, fx=self.escala, fy=self.escala,
+                                 interpolation=cv2.INTER_AREA)
+            if frame is not None:
+                frame = cv2.resize(frame, (pequeno.shape[1], pequeno.shape[0]),
+                                   interpolation=cv2.INTER_AREA)
+        else:
+            pequeno = gray
+
+        # Converte as caixas de volta para a resolução original.
+        self.faces = [dlib.rectangle(int(face.left() / self.escala),
+                                     int(face.top() / self.escala),
+                                     int(face.right() / self.escala),
+                                     int(face.bottom() / self.escala))
+                      for face in self.detector(pequeno, frame=frame)]
+
+        # Com detecção em todos os frames (como nos níveis mais altos do escalonador de
+        # qualidade), os rastreadores nunca seriam usados e não são criados.
+        self.rastreadores = []
+        if self.metodo == METODO_CORRELACAO and self.intervalo_deteccao > 1:
+            for face in self.faces:
+                rastreador = dlib.correlation_tracker()
+                rastreador.start_track(gray, face)
+                self.rastreadores.append(rastreador)
+
+        return list(self.faces)
+
+    @property
+    def taxa_deteccao(self):
+        # Fração dos frames em que a detecção completa rodou.
+        return self.deteccoes / self.frames if self.frames else 0.0
+
+    def zerar(self):
+        # Descarta as contagens anteriores (por exemplo, as do aquecimento de um benchmark).
+        self.deteccoes = 0
+        self.frames = 0
+
+    def valores(self):
+        return {"deteccoes_completas": self.deteccoes, "frames_localizados": self.frames,
+                "taxa_deteccao": self.taxa_deteccao}
+
+    @staticmethod
+    def _para_retangulo(posicao):
+        # O rastreador retorna um dlib.drectangle, que é convertido para dlib.rectangle.
+        return dlib.rectangle(int(posicao.left()), int(posicao.top()),
+                              int(posicao.right()), int(posicao.bottom()))
+
+# Envolve o detector de faces no modo de rastreamento, se ativado no arquivo de configuração.
+
+
+def criar_localizador_faces(detector):
+    if not get_tracking_enabled():
+        return detector
+    return TrackingFaceDetector(detector, get_detection_interval(), get_detection_scale(),
+                                get_tracking_method(), get_tracking_min_confidence())
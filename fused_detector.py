@@ -0,0 +1,354 @@
+# fused_detector.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import time
+from collections import namedtuple
+
+import cv2
+from utils import initialize_video, initialize_detector
+from utils import shape_para_array, calcular_ear_lote, mapa_pontos
+from utils import ContadorFPS, criar_relogio_video
+from config import get_ear_threshold, get_tempo_alerta
+from config import get_pipeline_enabled, get_capture_buffer_size
+from config import get_buffer_pool_enabled, obter_configuracao, versao_configuracao
+from config import iniciar_recarga_automatica
+from metricas import TECNICAS, criar_consumidores
+from face_tracker import criar_localizador_faces, TrackingFaceDetector
+from face_detectors import backend_deteccao
+from pipeline import LatestFrameBuffer, CaptureThread, InferenceThread
+from cronometro import StageTimer
+from alertas import criar_despachante_alertas
+from modelos import aquecer_preditor
+from renderer import criar_renderizador, desenhar_anotacoes, montar_linhas
+from servidor_metricas import iniciar_servidor_metricas
+from buffers import FramePool, ContadorMemoria
+from landmark_gate import criar_portao_landmarks
+from driver_selector import criar_seletor_motorista
+from quality_scheduler import criar_escalonador_qualidade
+
+# Descrição:
+# Este script implementa um motor unificado de detecção de sonolência.
+# Cada frame é lido uma única vez, a detecção de faces e o preditor de pontos faciais (o modelo
+# de 68 pontos ou o modelo compacto só dos olhos) rodam uma única vez, e o EAR resultante
+# alimenta todos os consumidores de métricas habilitados (EAR, PERCLOS e piscadas, definidos em
+# metricas.py), que são atualizados no mesmo frame.
+
+# Nome do fluxo de vídeo nas métricas publicadas pelo detector local (uma única câmera).
+FLUXO_LOCAL = "local"
+
+# Resultado do processamento de um frame pelo motor.
+ResultadoFrame = namedtuple(
+    "ResultadoFrame", ["timestamp", "faces", "landmarks", "ear", "alerta"])
+
+
+class FusedEngine:
+    def __init__(self, detector, predictor, consumidores, cronometro=None, buffers=None,
+                 portao=None, seletor=None, escalonador=None):
+        self.detector = detector
+        self.predictor = predictor
+        # Índices dos pontos dos olhos no modelo carregado (68 pontos ou apenas os 12 dos olhos).
+        self.mapa = mapa_pontos(predictor.num_parts)
+        self.consumidores = consumidores
+        # Mede o tempo de cada etapa do processamento (ver cronometro.py).
+        self.cronometro = cronometro if cronometro is not None else StageTimer()
+        # Buffers reutilizados entre frames (ver buffers.py); None aloca novos a cada frame.
+        self.buffers = buffers
+        # Portão de movimento que reutiliza os pontos faciais quando os olhos estão parados
+        # (ver landmark_gate.py); None roda o preditor em todos os frames.
+        self.portao = portao
+        # Seletor que escolhe a face do motorista (ver driver_selector.py); None processa
+        # todas as faces localizadas.
+        self.seletor = seletor
+        # Escalonador adaptativo de qualidade (ver quality_scheduler.py), que recebe o tempo
+        # de cada frame medido pelo loop; None mantém a qualidade fixa.
+        self.escalonador = escalonador
+        # Versão da configuração aplicada aos consumidores (ver config.versao_configuracao).
+        self.versao_configuracao = versao_configuracao()
+
+    def processar_frame(self, frame, timestamp):
+        """
+        Processa um frame: detecta as faces, identifica os pontos dos olhos, calcula o EAR
+        e atualiza todos os consumidores de métricas.
+
+        Argumentos:
+        frame -- Frame BGR lido da fonte de vídeo.
+        timestamp -- Instante de captura do frame, em segundos.
+
+        Retorna:
+        ResultadoFrame -- Faces, pontos faciais (arrays (num_pontos, 2)), EAR e estado de alerta
+                          do frame.
+        """
+        cronometro = self.cronometro
+        buffers = self.buffers
+
+        # Se o config.ini foi recarregado, os novos limiares são aplicados antes deste frame.
+        versao = versao_configuracao()
+        if versao != self.versao_configuracao:
+            self.versao_configuracao = versao
+            settings = obter_configuracao()
+            for consumidor in self.consumidores:
+                consumidor.reconfigurar(settings)
+
+        # Converte o frame para escala de cinza para detecção de faces.
+        with cronometro.etapa("conversao_cinza"):
+            if buffers is not None:
+                gray = buffers.cinza(frame)
+            else:
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Detecta faces no frame; o frame colorido segue junto para os detectores que usam cor.
+        with cronometro.etapa("deteccao"):
+            faces = self.detector(gray, frame=frame)
+            # Mantém apenas a face do motorista; as demais não passam pelo preditor.
+            if self.seletor is not None:
+                faces = self.seletor(faces, gray.shape)
+
+        landmarks = None
+        if self.portao is not None:
+            with cronometro.etapa("portao_landmarks"):
+                landmarks = self.portao.reutilizar(gray, faces, timestamp)
+
+        # Identifica os pontos faciais de cada face e os converte uma única vez em um array
+        # (num_pontos, 2).
+        if landmarks is None:
+            num_pontos = self.mapa.num_pontos
+            with cronometro.etapa("landmarks"):
+                landmarks = [shape_para_array(self.predictor(gray, face),
+                                              out=buffers.landmarks(i, num_pontos)
+                                              if buffers is not None else None)
+                             for i, face in enumerate(faces)]
+            if self.portao is not None:
+                self.portao.registrar(gray, landmarks, timestamp)
+
+        # Calcula a média do EAR dos dois olhos; as métricas usam a última face processada.
+        with cronometro.etapa("ear"):
+            ear = float(calcular_ear_lote(landmarks[-1])) if landmarks else None
+
+        # No modo de rastreamento, os pontos faciais servem de semente para o próximo frame.
+        if hasattr(self.detector, "atualizar_formas"):
+            self.detector.atualizar_formas(landmarks, faces)
+
+        # Todos os consumidores são atualizados com o mesmo EAR, no mesmo frame.
+        with cronometro.etapa("metricas"):
+            for consumidor in self.consumidores:
+                consumidor.atualizar(ear, timestamp)
+
+        return ResultadoFrame(timestamp, faces, landmarks, ear, self.alerta)
+
+    @property
+    def alerta(self):
+        # O alerta é ativado quando qualquer uma das técnicas habilitadas detecta sonolência.
+        return any(consumidor.alerta for consumidor in self.consumidores)
+
+    @property
+    def origem_alerta(self):
+        # Nomes das técnicas que estão detectando sonolência.
+        return [consumidor.nome for consumidor in self.consumidores if consumidor.alerta]
+
+    def notificar(self, despachante, resultado):
+        # Informa ao despachante de alertas o estado do frame, sem bloquear o loop.
+        despachante.notificar(resultado.alerta, resultado.timestamp, self.origem_alerta)
+
+    def valores_deteccao(self):
+        # Contadores da localização de faces: detecções completas feitas pelo rastreador, faces
+        # descartadas pela seleção do motorista e tempo do backend de detecção, medido pelo
+        # próprio backend, sem o rastreamento e a seleção do motorista, que também entram na
+        # etapa "deteccao" do cronômetro.
+        valores = {}
+        if isinstance(self.detector, TrackingFaceDetector):
+            valores.update(self.detector.valores())
+        backend = backend_deteccao(self.detector)
+        if backend is not None:
+            valores.update(backend.valores())
+        if self.seletor is not None:
+            valores.update(self.seletor.valores())
+        return valores
+
+# Desenha os olhos detectados e os textos de todos os consumidores sobre o frame.
+
+
+def desenhar_overlay(frame, resultado, consumidores, fps, linhas_extras=(), desenhar_olhos=True):
+    desenhar_anotacoes(frame, resultado.landmarks, montar_linhas(consumidores, fps, linhas_extras),
+                       desenhar_olhos)
+
+# Linhas de estado dos estágios opcionais do motor e se os olhos devem ser desenhados.
+
+
+def estado_overlay(motor):
+    linhas = []
+    if motor.portao is not None:
+        linhas.append(motor.portao.linha_overlay())
+    desenhar_olhos = True
+    if motor.escalonador is not None:
+        linhas.append(motor.escalonador.linha_overlay())
+        desenhar_olhos = motor.escalonador.atual.olhos
+    return linhas, desenhar_olhos
+
+# Define a função principal, que executa as técnicas escolhidas sobre a mesma fonte de vídeo.
+
+
+def detectar_sonolencia_fusionada(video_source=0, tecnicas=TECNICAS,
+                                  titulo_janela="Deteccao de Sono ao Volante"):
+    # Inicia o carregamento do preditor em segundo plano enquanto a câmera é aberta.
+    aquecer_preditor()
+    # Aplica as alterações do config.ini sem reiniciar a detecção, se configurado.
+    iniciar_recarga_automatica()
+
+    # Inicializa a captura de vídeo.
+    video = initialize_video(video_source)
+
+    # Inicializa o detector de faces e o preditor de pontos faciais uma única vez.
+    detector, predictor = initialize_detector()
+    # Ativa o modo de rastreamento da face, se configurado.
+    detector = criar_localizador_faces(detector)
+    # O escalonador de qualidade, se ativado, passa a controlar a detecção de faces.
+    escalonador = criar_escalonador_qualidade()
+    if escalonador is not None:
+        detector = escalonador.preparar(detector)
+
+    # Cria os consumidores das técnicas habilitadas.
+    consumidores = criar_consumidores(
+        tecnicas, get_ear_threshold(), get_tempo_alerta())
+    # Os buffers pré-alocados só podem ser usados no loop sequencial (ver buffers.py).
+    usar_buffers = get_buffer_pool_enabled() and not get_pipeline_enabled()
+    motor = FusedEngine(detector, predictor, consumidores,
+                        buffers=FramePool() if usar_buffers else None,
+                        portao=criar_portao_landmarks(),
+                        seletor=criar_seletor_motorista(), escalonador=escalonador)
+    # O som de alerta é decodificado uma única vez e tocado pela thread do despachante.
+    despachante = criar_despachante_alertas()
+
+    # Em arquivos de vídeo, as métricas usam o tempo do vídeo, e não o do processamento.
+    relogio = criar_relogio_video(video, video_source)
+    # Janela de pré-visualização, gravação em arquivo ou nenhum dos dois (RENDER_MODE).
+    renderizador = criar_renderizador(titulo_janela, video.get(cv2.CAP_PROP_FPS), relogio.arquivo)
+    # Servidor local de métricas para o gateway de telemetria, se ativado.
+    painel, servidor_metricas = iniciar_servidor_metricas()
+
+    try:
+        if get_pipeline_enabled():
+            executar_pipeline(video, motor, despachante, renderizador, relogio, painel)
+        else:
+            executar_sequencial(video, motor, despachante, renderizador, relogio, painel)
+    except KeyboardInterrupt:
+        # Sem janela, a detecção é encerrada com Ctrl+C.
+        pass
+    finally:
+        # Libera o dispositivo de captura, o despachante de alertas, o renderizador e o
+        # servidor de métricas.
+        video.release()
+        despachante.encerrar()
+        renderizador.fechar()
+        if servidor_metricas is not None:
+            servidor_metricas.encerrar()
+
+# Executa a leitura, a inferência e a renderização em série, na thread atual.
+
+
+def executar_sequencial(video, motor, despachante, renderizador, relogio=time.monotonic,
+                        painel=None):
+    contador_fps = ContadorFPS()
+    # No modo de buffers pré-alocados, mede também a alocação de memória por frame.
+    contador_memoria = ContadorMemoria() if motor.buffers is not None else None
+
+    # Loop para processar cada frame do vídeo.
+    while renderizador.continuar():
+        # Lê o próximo frame do vídeo (no buffer reutilizado, se ativado).
+        if motor.buffers is not None:
+            ret, frame = motor.buffers.ler(video)
+        else:
+            ret, frame = video.read()
+        # Se não houver frame, encerra o loop.
+        if not ret:
+            break
+
+        inicio_frame = time.perf_counter()
+        resultado = motor.processar_frame(frame, relogio())
+
+        # Informa o estado de alerta ao despachante, que dispara o som em sua própria thread.
+        motor.notificar(despachante, resultado)
+
+        fps = contador_fps.atualizar(time.monotonic())
+        if contador_memoria is not None:
+            contador_memoria.frame()
+        if painel is not None:
+            painel.publicar(FLUXO_LOCAL, motor, resultado, fps)
+
+        # O overlay só é montado quando o renderizador vai usar este frame.
+        if renderizador.quer_quadro(time.monotonic()):
+            linhas_extras, desenhar_olhos = estado_overlay(motor)
+            if contador_memoria is not None:
+                linhas_extras.append(contador_memoria.linha_overlay())
+            renderizador.renderizar(frame, resultado.landmarks,
+                                    montar_linhas(motor.consumidores, fps, linhas_extras),
+                                    desenhar_olhos)
+
+        # O tempo do frame (processamento e renderização) ajusta o nível de qualidade.
+        if motor.escalonador is not None:
+            motor.escalonador.registrar(time.perf_counter() - inicio_frame)
+
+    if contador_memoria is not None:
+        contador_memoria.fechar()
+
+# Executa a captura e a inferência em threads separadas; a renderização roda na thread atual,
+# pois o cv2.imshow precisa rodar na thread principal.
+
+
+def executar_pipeline(video, motor, despachante, renderizador, relogio=None, painel=None):
+    # Em arquivos de vídeo nenhum frame é descartado: a captura e a inferência aguardam os
+    # estágios seguintes, como na execução sequencial.
+    arquivo = relogio is not None and relogio.arquivo
+    buffer_captura = LatestFrameBuffer(get_capture_buffer_size(), bloquear=arquivo)
+    buffer_exibicao = LatestFrameBuffer(1, bloquear=arquivo)
+    contador_fps = ContadorFPS()
+
+    def processar(capturado):
+        inicio_frame = time.perf_counter()
+        resultado = motor.processar_frame(capturado.frame, capturado.instante)
+        # O tempo de inferência ajusta o nível de qualidade; a renderização roda em outra thread.
+        if motor.escalonador is not None:
+            motor.escalonador.registrar(time.perf_counter() - inicio_frame)
+        # O alerta é disparado pela thread de inferência, sem esperar pela renderização.
+        motor.notificar(despachante, resultado)
+        # Latência entre a captura do frame e a decisão de alerta.
+        latencia = time.monotonic() - capturado.timestamp
+        fps = contador_fps.atualizar(time.monotonic())
+        if painel is not None:
+            painel.publicar(FLUXO_LOCAL, motor, resultado, fps, {
+                "latencia_captura_ms": latencia * 1000,
+                "frames_descartados": buffer_captura.descartados + buffer_exibicao.descartados})
+        return capturado.frame, resultado, latencia, fps
+
+    captura = CaptureThread(video, buffer_captura, relogio)
+    inferencia = InferenceThread(buffer_captura, buffer_exibicao, processar)
+    captura.start()
+    inferencia.start()
+
+    try:
+        while renderizador.continuar():
+            item = buffer_exibicao.get_latest()
+            if item is None:
+                break
+            if not renderizador.quer_quadro(time.monotonic()):
+                continue
+            frame, resultado, latencia, fps = item
+
+            linhas_extras, desenhar_olhos = estado_overlay(motor)
+            linhas_extras[:0] = [
+                f"Latencia: {latencia * 1000:.0f} ms",
+                f"Frames descartados: {buffer_captura.descartados + buffer_exibicao.descartados}"]
+            renderizador.renderizar(frame, resultado.landmarks,
+                                    montar_linhas(motor.consumidores, fps, linhas_extras),
+                                    desenhar_olhos)
+    finally:
+        captura.parar()
+        captura.join()
+        # Libera a inferência se ela estiver aguardando espaço no buffer de exibição.
+        buffer_exibicao.close()
+        inferencia.join()
+    # Se a inferência falhou, o buffer de exibição foi fechado como no fim do vídeo; a exceção
+    # é relançada aqui para interromper a execução com o erro original.
+    inferencia.verificar()
+
+
+# Permite que o script seja executado diretamente.
+if __name__ == "__main__":
+    detectar_sonolencia_fusionada()
@@ -0,0 +1,307 @@
+# landmark_cache.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import argparse
+import hashlib
+import itertools
+import math
+import os
+
+import numpy as np
+from utils import calcular_ear_lote
+from config import get_ear_threshold, get_tempo_alerta, obter_configuracao
+from config import get_drowsiness_percentage, get_perclos_window
+from config import adicionar_argumentos_configuracao, aplicar_argumentos_configuracao
+from metricas import TECNICAS, criar_consumidores
+
+# Descrição:
+# Este script grava e reproduz um cache dos pontos faciais de cada frame de um vídeo.
+# Para cada trecho processado são gravados os instantes dos frames, a caixa da face e os pontos
+# faciais (68, ou 12 com o modelo só dos olhos) em arquivos .npy, que podem ser abertos como
+# memory-map. Assim, os limiares (EAR_THRESHOLD, TEMPO_ALERTA, PERCLOS) podem ser reavaliados
+# sem rodar o detector de faces e o shape_predictor novamente.
+#
+# Estrutura do cache (a chave é o hash do vídeo e o hash do modelo e da configuração que
+# determinam os pontos faciais; cada trecho é identificado pelo seu primeiro e último frame):
+#   <diretorio>/<chave>/<inicio>-<fim>_timestamps.npy  -- (N,) float64
+#   <diretorio>/<chave>/<inicio>-<fim>_faces.npy       -- (N, 4) int32, -1 sem face
+#   <diretorio>/<chave>/<inicio>-<fim>_landmarks.npy   -- (N, 68 ou 12, 2) int32
+#
+# Exemplo de varredura de limiares sobre todos os vídeos em cache:
+#   python landmark_cache.py cache --ear-threshold 0.18 0.2 0.22 --tempo-alerta 0.5 0.8 \
+#       --porcentagem-sonolencia 25 30 --janela-perclos 30 60
+
+CAMPOS_CACHE = ("timestamps", "faces", "landmarks")
+# Caixa gravada nos frames sem face.
+SEM_FACE = (-1, -1, -1, -1)
+# Nome do último frame dos trechos lidos até o fim do vídeo.
+FIM_VIDEO = "fim"
+
+# Campos da configuração que alteram as faces e os pontos faciais gravados no cache.
+CAMPOS_CONFIGURACAO_CACHE = (
+    "face_detector_backend", "haar_cascade_path", "dnn_model_path", "dnn_config_path",
+    "dnn_confidence", "tracking_enabled", "detection_interval", "detection_scale",
+    "tracking_method", "tracking_min_confidence", "driver_selection_enabled",
+    "driver_selection_criterion", "driver_region", "driver_track_min_iou")
+
+# Calcula o hash do conteúdo de um arquivo de vídeo, usado como chave do cache.
+
+
+def hash_arquivo(video_path, tamanho_bloco=1 << 20):
+    sha1 = hashlib.sha1()
+    with open(video_path, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            sha1.update(bloco)
+    return sha1.hexdigest()
+
+# Calcula o hash do modelo de pontos faciais e da configuração da localização das faces, de modo
+# que um cache gravado com outro modelo, detector ou seletor do motorista não seja reutilizado.
+
+
+def hash_configuracao(settings=None):
+    settings = settings or obter_configuracao()
+    sha1 = hashlib.sha1(hash_arquivo(settings.predictor_path).encode())
+    for campo in CAMPOS_CONFIGURACAO_CACHE:
+        sha1.update(f"{campo}={getattr(settings, campo)!r};".encode())
+    return sha1.hexdigest()[:16]
+
+# Chave do cache de um vídeo: o hash do vídeo e o hash da configuração.
+
+
+def chave_cache(video_path, settings=None):
+    return f"{hash_arquivo(video_path)}_{hash_configuracao(settings)}"
+
+
+class LandmarkCache:
+    def __init__(self, diretorio, chave):
+        self.diretorio = os.path.join(diretorio, chave)
+        self.chave = chave
+
+    def _caminho(self, frame_inicio, frame_fim, campo):
+        fim = FIM_VIDEO if frame_fim is None else f"{frame_fim:09d}"
+        return os.path.join(self.diretorio, f"{frame_inicio:09d}-{fim}_{campo}.npy")
+
+    def existe(self, frame_inicio, frame_fim):
+        if not all(os.path.exists(self._caminho(frame_inicio, frame_fim, campo))
+                   for campo in CAMPOS_CACHE):
+            return False
+        # Os arrays devem ter o mesmo número de frames, que não pode passar do tamanho do trecho
+        # (pode ser menor apenas quando o vídeo termina antes do previsto).
+        timestamps, faces, landmarks = self.carregar(frame_inicio, frame_fim)
+        return (len(timestamps) == len(faces) == len(landmarks)
+                and (frame_fim is None or len(timestamps) <= frame_fim - frame_inicio))
+
+    def trechos(self):
+        # Retorna os trechos gravados, como tuplas (frame_inicio, frame_fim), em ordem.
+        if not os.path.isdir(self.diretorio):
+            return []
+        trechos = set()
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith("_timestamps.npy"):
+                inicio, fim = nome[:-len("_timestamps.npy")].split("-")
+                trechos.add((int(inicio), None if fim == FIM_VIDEO else int(fim)))
+        return sorted(trechos, key=lambda trecho: (trecho[0], -(trecho[1] or math.inf)))
+
+    def trechos_sem_sobreposicao(self):
+        # Quando o mesmo vídeo foi gravado com divisões diferentes (--trechos), escolhe trechos
+        # que não se sobrepõem, preferindo os que começam antes e, entre eles, os mais longos,
+        # para que nenhum frame seja contado duas vezes.
+        escolhidos = []
+        coberto = 0
+        for inicio, fim in self.trechos():
+            if inicio >= coberto:
+                escolhidos.append((inicio, fim))
+                coberto = math.inf if fim is None else fim
+        return [trecho for trecho in escolhidos if self.existe(*trecho)]
+
+    def intervalo(self, inicio, fim):
+        """
+        Reúne, dos trechos em cache, os frames [inicio, fim) de um vídeo.
+
+        Retorna:
+        partes -- Lista de tuplas (timestamps, faces, landmarks) que cobrem o intervalo, em
+                  ordem, ou None se algum frame do intervalo não estiver em cache.
+        """
+        partes = []
+        proximo = inicio
+        for trecho_inicio, trecho_fim in self.trechos_sem_sobreposicao():
+            if proximo >= fim:
+                break
+            arrays = self.carregar(trecho_inicio, trecho_fim)
+            trecho_final = trecho_inicio + len(arrays[0])
+            if trecho_inicio <= proximo < trecho_final:
+                corte = slice(proximo - trecho_inicio, min(fim, trecho_final) - trecho_inicio)
+                partes.append(tuple(array[corte] for array in arrays))
+                proximo = min(fim, trecho_final)
+        return partes if proximo >= fim else None
+
+    def salvar(self, frame_inicio, frame_fim, timestamps, faces, landmarks, num_pontos=68):
+        os.makedirs(self.diretorio, exist_ok=True)
+        arrays = {"timestamps": np.asarray(timestamps, dtype=np.float64),
+                  "faces": np.asarray(faces, dtype=np.int32).reshape(-1, 4),
+                  "landmarks": np.asarray(landmarks, dtype=np.int32).reshape(
+                      len(timestamps), num_pontos, 2)}
+        # Os timestamps são gravados por último, pois marcam o trecho como completo.
+        for campo in reversed(CAMPOS_CACHE):
+            np.save(self._caminho(frame_inicio, frame_fim, campo), arrays[campo])
+
+    def carregar(self, frame_inicio, frame_fim):
+        # Abre os arrays do trecho como memory-map, sem copiá-los para a memória.
+        return tuple(np.load(self._caminho(frame_inicio, frame_fim, campo), mmap_mode="r")
+                     for campo in CAMPOS_CACHE)
+
+# Acumula os pontos faciais de cada frame processado até que o trecho seja gravado.
+
+
+class GravadorCache:
+    def __init__(self, num_pontos=68):
+        # Número de pontos do modelo, usado nos frames sem face.
+        self.num_pontos = num_pontos
+        self.timestamps = []
+        self.faces = []
+        self.landmarks = []
+
+    def adicionar(self, resultado):
+        # Grava a face cujo EAR alimentou as métricas (a última face processada no frame).
+        self.timestamps.append(resultado.timestamp)
+        if resultado.landmarks:
+            face = resultado.faces[len(resultado.landmarks) - 1]
+            self.faces.append((face.left(), face.top(), face.right(), face.bottom()))
+            self.landmarks.append(resultado.landmarks[-1])
+        else:
+            self.faces.append(SEM_FACE)
+            self.landmarks.append(np.zeros((self.num_pontos, 2), dtype=np.int32))
+
+    def salvar(self, cache, frame_inicio, frame_fim):
+        cache.salvar(frame_inicio, frame_fim, self.timestamps, self.faces, self.landmarks,
+                     self.num_pontos)
+
+# Reproduz um trecho em cache sobre os consumidores de métricas, sem rodar o dlib.
+
+
+def calcular_ears(faces, landmarks):
+    """
+    Calcula o EAR de todos os frames de um trecho em cache, de uma só vez e de forma vetorizada.
+
+    Argumentos:
+    faces -- Array (N, 4) com a caixa da face de cada frame (SEM_FACE quando não há face).
+    landmarks -- Array (N, 68, 2) ou (N, 12, 2) com os pontos faciais de cada frame.
+
+    Retorna:
+    ears -- Lista com o EAR de cada frame, ou None nos frames sem face.
+    """
+    # Os frames sem face (pontos zerados) produzem NaN, que é descartado abaixo.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ears = calcular_ear_lote(landmarks)
+    # A linha inteira é comparada com SEM_FACE: caixas reais podem ter coordenadas negativas
+    # (faces cortadas na borda do frame ou a margem do rastreamento por landmarks).
+    com_face = (faces != SEM_FACE).any(axis=1)
+    return [ear if face else None for ear, face in zip(ears.tolist(), com_face.tolist())]
+
+
+def reproduzir(timestamps, faces, landmarks, consumidores, ears=None):
+    """
+    Alimenta os consumidores de métricas com os frames de um trecho em cache.
+
+    Argumentos:
+    timestamps -- Array (N,) com o instante de cada frame.
+    faces -- Array (N, 4) com a caixa da face de cada frame (-1 quando não há face).
+    landmarks -- Array (N, 68, 2) ou (N, 12, 2) com os pontos faciais de cada frame.
+    consumidores -- Lista de consumidores de métricas (metricas.py).
+    ears -- EARs já calculados por calcular_ears (opcional), reutilizados entre reproduções.
+
+    Retorna:
+    linhas -- Iterador de tuplas (timestamp, ear, alerta), uma por frame.
+    """
+    if ears is None:
+        ears = calcular_ears(faces, landmarks)
+    for timestamp, ear in zip(timestamps.tolist(), ears):
+        for consumidor in consumidores:
+            consumidor.atualizar(ear, timestamp)
+        yield timestamp, ear, any(consumidor.alerta for consumidor in consumidores)
+
+# Reavalia todos os vídeos em cache para cada combinação de limiares.
+
+
+def varrer_limiares(diretorio, ear_thresholds, tempos_alerta, porcentagens_sonolencia=None,
+                    janelas_perclos=None, tecnicas=TECNICAS):
+    """
+    Reproduz os trechos em cache de cada vídeo para cada combinação de parâmetros.
+
+    Argumentos:
+    diretorio -- Diretório do cache gravado pelo batch_analysis.py.
+    ear_thresholds -- Limiares EAR avaliados.
+    tempos_alerta -- Tempos de alerta avaliados.
+    porcentagens_sonolencia -- Limiares de PERCLOS (%) avaliados (padrão: DROWSINESS_PERCENTAGE).
+    janelas_perclos -- Janelas do PERCLOS (s) avaliadas (padrão: PERCLOS_WINDOW).
+    tecnicas -- Técnicas de métricas avaliadas.
+
+    Retorna:
+    resultados -- Lista de dicionários, um por vídeo e combinação de parâmetros.
+    """
+    porcentagens_sonolencia = porcentagens_sonolencia or [get_drowsiness_percentage()]
+    janelas_perclos = janelas_perclos or [get_perclos_window()]
+    resultados = []
+    chaves = sorted(nome for nome in os.listdir(diretorio)
+                    if os.path.isdir(os.path.join(diretorio, nome)))
+    for chave in chaves:
+        cache = LandmarkCache(diretorio, chave)
+        trechos = [cache.carregar(*trecho) for trecho in cache.trechos_sem_sobreposicao()]
+        # O EAR não depende dos parâmetros varridos: é calculado uma única vez por trecho.
+        ears = [calcular_ears(faces, landmarks) for _, faces, landmarks in trechos]
+        for ear_threshold, tempo_alerta, porcentagem, janela in itertools.product(
+                ear_thresholds, tempos_alerta, porcentagens_sonolencia, janelas_perclos):
+            frames = 0
+            frames_em_alerta = 0
+            valores = {}
+            # Os trechos não se sobrepõem e estão em ordem: o estado das métricas continua de um
+            # trecho para o seguinte, como em uma análise do vídeo inteiro.
+            consumidores = criar_consumidores(tecnicas, ear_threshold, tempo_alerta,
+                                              janela, porcentagem)
+            for (timestamps, faces, landmarks), ears_trecho in zip(trechos, ears):
+                for _, _, alerta in reproduzir(timestamps, faces, landmarks, consumidores,
+                                               ears_trecho):
+                    frames += 1
+                    frames_em_alerta += alerta
+            for consumidor in consumidores:
+                valores.update(consumidor.valores())
+            resultados.append(dict({"chave": chave, "ear_threshold": ear_threshold,
+                                    "tempo_alerta": tempo_alerta,
+                                    "drowsiness_percentage": porcentagem,
+                                    "perclos_window": janela, "frames": frames,
+                                    "frames_em_alerta": frames_em_alerta}, **valores))
+    return resultados
+
+
+def main():
+    # Importado aqui para evitar a dependência circular com o batch_analysis.
+    from batch_analysis import gravar_tabela
+
+    parser = argparse.ArgumentParser(
+        description="Reavalia os limiares de sonolência sobre os pontos faciais em cache.")
+    parser.add_argument("diretorio", help="Diretório do cache gravado pelo batch_analysis.py.")
+    parser.add_argument("--ear-threshold", type=float, nargs="+",
+                        help="Limiares EAR avaliados (padrão: EAR_THRESHOLD do config.ini).")
+    parser.add_argument("--tempo-alerta", type=float, nargs="+",
+                        help="Tempos de alerta avaliados (padrão: TEMPO_ALERTA do config.ini).")
+    parser.add_argument("--porcentagem-sonolencia", type=float, nargs="+",
+                        help="Limiares de PERCLOS (%%) avaliados "
+                             "(padrão: DROWSINESS_PERCENTAGE do config.ini).")
+    parser.add_argument("--janela-perclos", type=float, nargs="+",
+                        help="Janelas do PERCLOS (s) avaliadas (padrão: PERCLOS_WINDOW do config.ini).")
+    parser.add_argument("--tecnicas", nargs="+", choices=TECNICAS, default=list(TECNICAS))
+    parser.add_argument("--saida", default="varredura",
+                        help="Arquivo (sem extensão) onde o resultado é gravado.")
+    parser.add_argument("--formato", choices=("csv", "parquet"), default="csv")
+    adicionar_argumentos_configuracao(parser)
+    args = parser.parse_args()
+    aplicar_argumentos_configuracao(args)
+
+    resultados = varrer_limiares(args.diretorio, args.ear_threshold or [get_ear_threshold()],
+                                 args.tempo_alerta or [get_tempo_alerta()],
+                                 args.porcentagem_sonolencia, args.janela_perclos, args.tecnicas)
+    gravar_tabela(resultados, args.saida, args.formato)
+    print(f"{len(resultados)} combinações avaliadas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# landmark_gate.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import cv2
+import numpy as np
+from utils import mapa_pontos
+from config import get_landmark_gate_enabled, get_landmark_gate_threshold
+from config import get_landmark_gate_max_age
+
+# Descrição:
+# Este script implementa o portão de movimento da inferência dos pontos faciais.
+# Antes de rodar o shape_predictor, a região dos olhos (pontos dos olhos do último resultado)
+# é recortada do frame em escala de cinza, reduzida para poucos pixels e comparada, pela média
+# da diferença absoluta, com o recorte do frame em que os pontos foram calculados. Se a região
+# não mudou além do limiar, os pontos faciais (e, portanto, o EAR) do último cálculo são
+# reutilizados. O fechamento das pálpebras altera a região dos olhos e reabre o portão; mesmo
+# assim, os pontos são recalculados ao menos a cada LANDMARK_GATE_MAX_AGE segundos.
+
+# Tamanho (largura, altura) do recorte reduzido da região dos olhos.
+TAMANHO_RECORTE = (32, 8)
+
+# Margem (proporcional ao tamanho da região) adicionada ao redor dos pontos dos olhos.
+MARGEM_REGIAO_OLHOS = 0.25
+
+
+class LandmarkGate:
+    def __init__(self, limiar=4.0, idade_maxima=0.2):
+        # Média da diferença absoluta (níveis de cinza) abaixo da qual a região é considerada parada.
+        self.limiar = limiar
+        # Tempo máximo (s) durante o qual um resultado pode ser reutilizado.
+        self.idade_maxima = idade_maxima
+        self.landmarks = None
+        self.regioes = []
+        self.recortes = []
+        self.timestamp = None
+        # Última diferença medida, útil para ajustar o limiar.
+        self.diferenca = 0.0
+        # Contadores usados para acompanhar quantas chamadas ao preditor foram evitadas.
+        self.frames = 0
+        self.reutilizados = 0
+
+    def reutilizar(self, gray, faces, timestamp):
+        """
+        Verifica se os pontos faciais do último cálculo podem ser reutilizados no frame atual.
+
+        Argumentos:
+        gray -- Frame em escala de cinza.
+        faces -- Faces localizadas no frame atual.
+        timestamp -- Instante de captura do frame, em segundos.
+
+        Retorna:
+        landmarks -- Lista de arrays de pontos do último cálculo, ou None se o preditor precisa rodar.
+        """
+        self.frames += 1
+        if (self.landmarks is None or len(faces) != len(self.landmarks)
+                or timestamp - self.timestamp >= self.idade_maxima):
+            return None
+
+        diferenca = 0.0
+        for regiao, recorte in zip(self.regioes, self.recortes):
+            diferenca = max(diferenca, float(cv2.absdiff(self._recortar(gray, regiao), recorte).mean()))
+            if diferenca > self.limiar:
+                break
+        self.diferenca = diferenca
+        if diferenca > self.limiar:
+            return None
+
+        self.reutilizados += 1
+        return self.landmarks
+
+    def registrar(self, gray, landmarks, timestamp):
+        # Guarda os pontos faciais recém-calculados e o recorte da região dos olhos de referência.
+        self.landmarks = landmarks
+        self.timestamp = timestamp
+        self.regioes = [self._regiao_olhos(pontos, gray.shape) for pontos in landmarks]
+        self.recortes = [self._recortar(gray, regiao) for regiao in self.regioes]
+
+    @staticmethod
+    def _regiao_olhos(pontos, forma):
+        olhos = pontos[mapa_pontos(len(pontos)).olhos]
+        (x_min, y_min), (x_max, y_max) = olhos.min(axis=0), olhos.max(axis=0)
+        margem_x = int((x_max - x_min) * MARGEM_REGIAO_OLHOS) + 1
+        margem_y = int((y_max - y_min) * MARGEM_REGIAO_OLHOS) + 1
+        altura, largura = forma[:2]
+        return (max(0, int(x_min) - margem_x), max(0, int(y_min) - margem_y),
+                min(largura, int(x_max) + margem_x), min(altura, int(y_max) + margem_y))
+
+    @staticmethod
+    def _recortar(gray, regiao):
+        x1, y1, x2, y2 = regiao
+        if x2 <= x1 or y2 <= y1:
+            return np.zeros(TAMANHO_RECORTE[::-1], dtype=np.uint8)
+        return cv2.resize(gray[y1:y2, x1:x2], TAMANHO_RECORTE, interpolation=cv2.INTER_AREA)
+
+    @property
+    def taxa_acerto(self):
+        # Fração dos frames em que o preditor de pontos faciais não precisou rodar.
+        return self.reutilizados / self.frames if self.frames else 0.0
+
+    def valores(self):
+        return {"frames": self.frames, "reutilizados": self.reutilizados,
+                "taxa_acerto": self.taxa_acerto}
+
+    def linha_overlay(self):
+        return f"Landmarks reutilizados: {self.taxa_acerto * 100:.0f}%"
+
+# Cria o portão de movimento, se ativado no arquivo de configuração.
+
+
+def criar_portao_landmarks():
+    if not get_landmark_gate_enabled():
+        return None
+    return LandmarkGate(get_landmark_gate_threshold(), get_landmark_gate_max_age())
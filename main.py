@@ -3,36 +3,75 @@
 # 1. EAR (Eye Aspect Ratio): Mede a abertura dos olhos para identificar sonolência.
 # 2. PERCLOS (Percentage of Eyelid Closure): Calcula a porcentagem de tempo com os olhos fechados.
 # 3. Análise de Frequência e Duração das Piscadas: Avalia a frequência e duração das piscadas dos olhos.
+# As técnicas também podem ser combinadas no motor unificado, que lê cada frame e roda o
+# detector de faces e o preditor de pontos faciais uma única vez para todas elas.
 
-# Importando os módulos dos detectores
-import ear_detector
-import perclos_detector
-import piscadas_detector
+# Os módulos dos detectores (e, com eles, o OpenCV e o dlib) são importados apenas quando a
+# técnica é escolhida, para que o menu apareça imediatamente.
+import argparse
+
+from metricas import TECNICAS
+from modelos import aquecer_preditor
+from config import adicionar_argumentos_configuracao, aplicar_argumentos_configuracao
+
+
+# Converte uma lista de números digitados (por exemplo "1,3") nos nomes das técnicas.
+
+
+def ler_tecnicas(entrada):
+    tecnicas = []
+    for numero in entrada.replace(" ", "").split(","):
+        if not numero.isdigit() or not 1 <= int(numero) <= len(TECNICAS):
+            return None
+        tecnica = TECNICAS[int(numero) - 1]
+        if tecnica not in tecnicas:
+            tecnicas.append(tecnica)
+    return tecnicas
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Detecção de sonolência ao volante.")
+    adicionar_argumentos_configuracao(parser)
+    aplicar_argumentos_configuracao(parser.parse_args())
+
+    # Carrega o preditor de pontos faciais em segundo plano enquanto o usuário escolhe a técnica.
+    aquecer_preditor()
+
     while True:
         print("Selecione a técnica de detecção de sonolência:")
         print("1: EAR (Eye Aspect Ratio)")
         print("2: PERCLOS (Percentage of Eyelid Closure)")
         print("3: Análise de Frequência e Duração das Piscadas")
+        print("4: Combinar técnicas no motor unificado")
         print("Pressione 'q' para sair")
-        escolha = input("Digite o número da técnica escolhida (1, 2, ou 3): ")
+        escolha = input("Digite o número da técnica escolhida (1, 2, 3 ou 4): ")
 
         if escolha == '1':
             # Chama a detecção de sonolência usando EAR
+            import ear_detector
             ear_detector.detectar_sonolencia_ear()
         elif escolha == '2':
             # Chama a detecção de sonolência usando PERCLOS
+            import perclos_detector
             perclos_detector.detect_drowsiness_perclos()
         elif escolha == '3':
             # Chama a detecção de sonolência usando análise de piscadas
+            import piscadas_detector
             piscadas_detector.detectar_sonolencia_piscadas()
+        elif escolha == '4':
+            # Executa as técnicas escolhidas sobre o mesmo fluxo de pontos faciais
+            tecnicas = ler_tecnicas(
+                input("Digite as técnicas a combinar (por exemplo 1,2,3): "))
+            if tecnicas:
+                import fused_detector
+                fused_detector.detectar_sonolencia_fusionada(tecnicas=tecnicas)
+            else:
+                print("Combinação inválida. Use números de 1 a 3 separados por vírgula.")
         elif escolha == 'q':
             # Opção para sair do programa
             break
         else:
-            print("Escolha inválida. Por favor, selecione 1, 2, ou 3.")
+            print("Escolha inválida. Por favor, selecione 1, 2, 3 ou 4.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,288 @@
+# metricas.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+from collections import deque
+
+from config import get_perclos_window, get_drowsiness_percentage, get_perclos_min_window
+from config import get_blink_duration_limit, get_blink_window
+from blink_events import BlinkSegmenter
+
+# Descrição:
+# Consumidores de métricas usados pelo motor unificado (fused_detector.py).
+# Cada consumidor recebe, a cada frame, o EAR já calculado e o instante de captura do frame,
+# e atualiza apenas o seu próprio estado. Nenhum consumidor lê a câmera ou roda o detector
+# de faces, de modo que as três técnicas podem ser avaliadas sobre o mesmo fluxo de pontos.
+
+# Valores padrão dos parâmetros das métricas. Os valores em uso vêm do config.ini
+# (DROWSINESS_PERCENTAGE, PERCLOS_WINDOW, PERCLOS_MIN_WINDOW, BLINK_DURATION_LIMIT e BLINK_WINDOW)
+# e podem ser alterados com o processo em execução (ver reconfigurar).
+DROWSINESS_PERCENTAGE = 30
+JANELA_PERCLOS = 60
+JANELA_MINIMA_PERCLOS = 1.0
+LIMITE_DURACAO_PISCADA = 0.4
+JANELA_PISCADAS = 60
+
+# Cores usadas nos textos do overlay (BGR).
+COR_BRANCA = (255, 255, 255)
+COR_VERDE = (0, 255, 0)
+COR_VERMELHA = (0, 0, 255)
+
+
+# Classe base dos consumidores de métricas.
+
+
+class MetricConsumer:
+    # Nome curto da técnica, usado na seleção feita pelo main.py.
+    nome = ""
+
+    def __init__(self):
+        self.alerta = False
+
+    def atualizar(self, ear, timestamp):
+        """
+        Atualiza o estado do consumidor com os dados de um frame.
+
+        Argumentos:
+        ear -- EAR médio dos dois olhos no frame, ou None se nenhuma face foi encontrada.
+        timestamp -- Instante de captura do frame, em segundos.
+        """
+        raise NotImplementedError
+
+    def reconfigurar(self, settings):
+        """
+        Aplica os limiares de uma nova configuração. Chamado pelo motor entre dois frames,
+        quando o config.ini é recarregado; o estado acumulado da métrica é mantido.
+
+        Argumentos:
+        settings -- Objeto config.Settings com a nova configuração.
+        """
+        pass
+
+    def linhas_overlay(self):
+        # Retorna uma lista de tuplas (texto, cor) exibidas no overlay do frame.
+        return []
+
+    def valores(self):
+        # Retorna um dicionário com os valores numéricos atuais da métrica, usados nos relatórios.
+        return {}
+
+# Consumidor da técnica EAR: mede por quanto tempo os olhos permanecem fechados.
+
+
+class EarMetric(MetricConsumer):
+    nome = "ear"
+
+    def __init__(self, ear_threshold, tempo_alerta):
+        super().__init__()
+        self.ear_threshold = ear_threshold
+        self.tempo_alerta = tempo_alerta
+        self.ear = 0
+        self.contador_fechados = 0
+        self.tempo_acumulado_fechado = 0
+        self.ultimo_timestamp = None
+
+    def atualizar(self, ear, timestamp):
+        # Intervalo desde o frame anterior, usado no lugar de 1/fps.
+        intervalo = 0 if self.ultimo_timestamp is None else timestamp - self.ultimo_timestamp
+        self.ultimo_timestamp = timestamp
+
+        if ear is None:
+            return
+        self.ear = ear
+
+        # Verifica se o EAR está abaixo do limiar de sonolência.
+        if ear < self.ear_threshold:
+            self.contador_fechados += intervalo
+            self.tempo_acumulado_fechado += intervalo
+        else:
+            # Se o contador exceder o tempo de alerta, ativa o alerta de sonolência.
+            if self.contador_fechados >= self.tempo_alerta:
+                self.alerta = True
+            self.contador_fechados = 0
+
+    def reconfigurar(self, settings):
+        self.ear_threshold = settings.ear_threshold
+        self.tempo_alerta = settings.tempo_alerta
+
+    def linhas_overlay(self):
+        return [
+            ("Sono Detectado!" if self.alerta else "Sono Nao Detectado",
+             COR_VERMELHA if self.alerta else COR_VERDE),
+            (f"EAR: {self.ear:.2f}", COR_BRANCA),
+            (f"Tempo com olhos fechados: {self.tempo_acumulado_fechado:.2f}s", COR_BRANCA),
+        ]
+
+    def valores(self):
+        return {"tempo_fechado": self.contador_fechados,
+                "tempo_acumulado_fechado": self.tempo_acumulado_fechado,
+                "alerta_ear": self.alerta}
+
+# Consumidor da técnica PERCLOS: porcentagem do tempo com olhos fechados em uma janela deslizante.
+
+
+class PerclosMetric(MetricConsumer):
+    nome = "perclos"
+
+    def __init__(self, ear_threshold, janela=JANELA_PERCLOS, limiar=DROWSINESS_PERCENTAGE,
+                 janela_minima=JANELA_MINIMA_PERCLOS):
+        super().__init__()
+        self.ear_threshold = ear_threshold
+        # Duração da janela deslizante, em segundos.
+        self.janela = janela
+        # Porcentagem de PERCLOS acima da qual o alerta é ativado.
+        self.limiar = limiar
+        # Tempo mínimo de observação, em segundos, antes que o alerta possa ser ativado.
+        self.janela_minima = janela_minima
+        # Amostras [inicio, duracao, fechado] dentro da janela, da mais antiga para a mais nova.
+        # Cada amostra cobre o intervalo entre dois frames e leva o estado do frame anterior,
+        # de modo que o resultado é ponderado pelo tempo e não depende da taxa de quadros.
+        self.amostras = deque()
+        # Somas mantidas a cada inserção e expiração, sem percorrer a janela.
+        self.tempo_total = 0.0
+        self.tempo_fechado = 0.0
+        self.ultimo_timestamp = None
+        self.ultimo_fechado = False
+        self.perclos = 0
+
+    def atualizar(self, ear, timestamp):
+        # Os frames sem face contam como olhos abertos, assim como na contagem por frames.
+        fechado = ear is not None and ear < self.ear_threshold
+
+        if self.ultimo_timestamp is not None and timestamp > self.ultimo_timestamp:
+            duracao = timestamp - self.ultimo_timestamp
+            self.amostras.append([self.ultimo_timestamp, duracao, self.ultimo_fechado])
+            self.tempo_total += duracao
+            if self.ultimo_fechado:
+                self.tempo_fechado += duracao
+            self._expirar(timestamp - self.janela)
+        self.ultimo_timestamp = timestamp
+        self.ultimo_fechado = fechado
+
+        if self.tempo_total > 0:
+            self.perclos = self.tempo_fechado / self.tempo_total * 100
+        # O alerta só é avaliado após um tempo mínimo de observação.
+        self.alerta = (self.tempo_total >= min(self.janela, self.janela_minima)
+                       and self.perclos > self.limiar)
+
+    def _expirar(self, limite):
+        # Remove as amostras que saíram da janela e recorta a que cruza o seu início.
+        while self.amostras:
+            amostra = self.amostras[0]
+            inicio, duracao, fechado = amostra
+            if inicio >= limite:
+                break
+            excedente = min(duracao, limite - inicio)
+            self.tempo_total -= excedente
+            if fechado:
+                self.tempo_fechado -= excedente
+            if excedente >= duracao:
+                self.amostras.popleft()
+            else:
+                amostra[0] = limite
+                amostra[1] = duracao - excedente
+                break
+        # Evita que o erro de ponto flutuante das somas se acumule quando a janela esvazia.
+        if not self.amostras:
+            self.tempo_total = self.tempo_fechado = 0.0
+
+    def reconfigurar(self, settings):
+        self.ear_threshold = settings.ear_threshold
+        self.limiar = settings.drowsiness_percentage
+        self.janela_minima = settings.perclos_min_window
+        # Uma janela menor descarta as amostras antigas na próxima atualização.
+        self.janela = settings.perclos_window
+
+    def linhas_overlay(self):
+        return [
+            ("Sono Detectado!" if self.alerta else "Sono Nao Detectado",
+             COR_VERMELHA if self.alerta else COR_VERDE),
+            (f"PERCLOS ({self.janela:.0f}s): {self.perclos:.2f}%", COR_BRANCA),
+            (f"Tempo Fechado/Total: {self.tempo_fechado:.1f}s/{self.tempo_total:.1f}s", COR_BRANCA),
+        ]
+
+    def valores(self):
+        return {"perclos": self.perclos,
+                "tempo_fechado_janela": self.tempo_fechado,
+                "alerta_perclos": self.alerta}
+
+# Consumidor da análise de piscadas: segmenta as piscadas pelo instante de captura dos frames e
+# calcula a taxa e a duração média das piscadas na janela recente (ver blink_events.py).
+
+
+class BlinkMetric(MetricConsumer):
+    nome = "piscadas"
+
+    def __init__(self, ear_threshold, janela=JANELA_PISCADAS, limite=LIMITE_DURACAO_PISCADA):
+        super().__init__()
+        self.ear_threshold = ear_threshold
+        # Duração média das piscadas (s) acima da qual a sonolência é sinalizada.
+        self.limite = limite
+        self.segmentador = BlinkSegmenter(ear_threshold, limite, janela)
+        self.piscadas = 0
+        self.media_duracao_piscadas = 0
+        self.taxa_piscadas = 0
+        # Evento encerrado no frame atual (ou None) e último evento encerrado.
+        self.evento = None
+        self.ultimo_evento = None
+
+    def atualizar(self, ear, timestamp):
+        self.evento = self.segmentador.atualizar(ear, timestamp)
+        if self.evento is not None:
+            self.ultimo_evento = self.evento
+            self.piscadas = self.segmentador.eventos
+            self.media_duracao_piscadas = self.segmentador.duracao_media()
+        self.taxa_piscadas = self.segmentador.taxa_por_minuto(timestamp)
+
+        self.alerta = self.media_duracao_piscadas > self.limite
+
+    def reconfigurar(self, settings):
+        self.ear_threshold = self.segmentador.ear_threshold = settings.ear_threshold
+        self.limite = self.segmentador.limite_piscada = settings.blink_duration_limit
+        self.segmentador.janela = settings.blink_window
+
+    def linhas_overlay(self):
+        return [
+            (f"Piscadas: {self.piscadas} ({self.taxa_piscadas:.1f}/min)", COR_BRANCA),
+            (f"Duracao Media das Piscadas: {self.media_duracao_piscadas:.2f}s", COR_BRANCA),
+            ("Sonolencia Detectada!" if self.alerta else "Sonolencia Nao Detectada",
+             COR_VERMELHA if self.alerta else COR_VERDE),
+        ]
+
+    def valores(self):
+        # Os campos do evento só são preenchidos no frame em que a piscada termina.
+        evento = self.evento
+        return {"piscadas": self.piscadas,
+                "media_duracao_piscadas": self.media_duracao_piscadas,
+                "taxa_piscadas": self.taxa_piscadas,
+                "alerta_piscadas": self.alerta,
+                "piscada_inicio": evento.inicio if evento else None,
+                "piscada_duracao": evento.duracao if evento else None,
+                "piscada_ear_minimo": evento.ear_minimo if evento else None,
+                "piscada_tipo": evento.tipo if evento else None}
+
+# Nomes das técnicas disponíveis, na ordem exibida pelo main.py.
+
+
+TECNICAS = (EarMetric.nome, PerclosMetric.nome, BlinkMetric.nome)
+
+# Cria os consumidores correspondentes às técnicas escolhidas.
+
+
+def criar_consumidores(tecnicas, ear_threshold, tempo_alerta, janela_perclos=None,
+                       limiar_perclos=None):
+    if janela_perclos is None:
+        janela_perclos = get_perclos_window()
+    if limiar_perclos is None:
+        limiar_perclos = get_drowsiness_percentage()
+    consumidores = []
+    for tecnica in tecnicas:
+        if tecnica == EarMetric.nome:
+            consumidores.append(EarMetric(ear_threshold, tempo_alerta))
+        elif tecnica == PerclosMetric.nome:
+            consumidores.append(PerclosMetric(ear_threshold, janela_perclos, limiar_perclos,
+                                              get_perclos_min_window()))
+        elif tecnica == BlinkMetric.nome:
+            consumidores.append(BlinkMetric(ear_threshold, get_blink_window(),
+                                            get_blink_duration_limit()))
+        else:
+            raise ValueError(f"Técnica desconhecida: {tecnica}")
+    return consumidores
@@ -0,0 +1,66 @@
+# modelos.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+# O dlib é importado apenas quando um modelo é carregado, pois a sua importação é demorada.
+import threading
+from concurrent.futures import Future
+
+from config import get_predictor_path
+
+# Descrição:
+# Este script mantém um cache, válido para todo o processo, dos preditores de pontos faciais
+# carregados, indexado pelo caminho do arquivo .dat. Cada modelo é lido do disco uma única vez,
+# mesmo quando o usuário troca de técnica no main.py, e o carregamento pode ser iniciado em
+# segundo plano (aquecer_preditor) enquanto a câmera é aberta.
+
+# Carregamentos por caminho do modelo: cada Future recebe o preditor quando a leitura termina.
+_preditores = {}
+_trava = threading.Lock()
+
+
+def _carregar(caminho, futuro):
+    try:
+        import dlib
+        futuro.set_result(dlib.shape_predictor(caminho))
+    except BaseException as erro:
+        futuro.set_exception(erro)
+
+
+def _obter_futuro(caminho, segundo_plano):
+    # Retorna o carregamento do modelo, iniciando-o se ainda não existir.
+    with _trava:
+        futuro = _preditores.get(caminho)
+        if futuro is not None:
+            # Um carregamento anterior que falhou é descartado para permitir uma nova tentativa.
+            if not (futuro.done() and futuro.exception() is not None):
+                return futuro
+        futuro = Future()
+        _preditores[caminho] = futuro
+
+    if segundo_plano:
+        threading.Thread(target=_carregar, args=(caminho, futuro),
+                         name="carregar-preditor", daemon=True).start()
+    else:
+        _carregar(caminho, futuro)
+    return futuro
+
+# Inicia o carregamento do preditor em segundo plano, sem bloquear.
+
+
+def aquecer_preditor(caminho=None):
+    return _obter_futuro(caminho or get_predictor_path(), segundo_plano=True)
+
+# Retorna o preditor do caminho informado, carregando-o apenas na primeira chamada.
+
+
+def carregar_preditor(caminho=None):
+    """
+    Retorna o preditor de pontos faciais, lendo o arquivo do disco apenas uma vez por processo.
+
+    Argumentos:
+    caminho -- Caminho do arquivo .dat do modelo (padrão: PREDICTOR_PATH do config.ini).
+
+    Retorna:
+    predictor -- O dlib.shape_predictor carregado. Se o modelo estiver sendo aquecido em
+                 segundo plano, aguarda o fim do carregamento.
+    """
+    return _obter_futuro(caminho or get_predictor_path(), segundo_plano=False).result()
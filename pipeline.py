@@ -0,0 +1,155 @@
+# pipeline.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import threading
+import time
+from collections import deque, namedtuple
+
+# Descrição:
+# Este script implementa os estágios do pipeline com threads: captura, inferência e exibição.
+# Os estágios se comunicam por buffers circulares limitados em que o frame mais recente vence:
+# quando a inferência atrasa, os frames mais antigos são descartados em vez de se acumularem,
+# e o alerta é sempre decidido sobre o frame mais novo. Cada frame carrega o instante da sua
+# captura por todos os estágios, permitindo medir a latência da câmera até o alerta.
+# Em fontes de arquivo os buffers são criados com bloquear=True: a captura espera por espaço
+# e os frames são entregues em ordem, de modo que todos os frames do vídeo são analisados.
+
+# Frame lido pela thread de captura, com o seu índice, o instante de captura (time.monotonic),
+# usado na medida da latência, e o instante do frame dado pelo relógio da fonte, usado nas métricas.
+FrameCapturado = namedtuple("FrameCapturado", ["indice", "timestamp", "frame", "instante"])
+
+
+class LatestFrameBuffer:
+    def __init__(self, capacidade=2, bloquear=False):
+        self._itens = deque(maxlen=max(1, capacidade))
+        self._condicao = threading.Condition()
+        self._fechado = False
+        # Sem descarte: put aguarda espaço no buffer e get_latest retorna o item mais antigo.
+        self.bloquear = bloquear
+        # Quantidade de itens descartados por falta de espaço no buffer.
+        self.descartados = 0
+
+    def put(self, item):
+        # Insere um item, descartando o mais antigo se o buffer estiver cheio. Com bloquear,
+        # aguarda até haver espaço; depois de fechado, o item é ignorado.
+        with self._condicao:
+            if self.bloquear:
+                self._condicao.wait_for(
+                    lambda: len(self._itens) < self._itens.maxlen or self._fechado)
+                if self._fechado:
+                    return
+            elif len(self._itens) == self._itens.maxlen:
+                self.descartados += 1
+            self._itens.append(item)
+            self._condicao.notify_all()
+
+    def get(self, timeout=None):
+        """
+        Retira o item mais antigo do buffer, aguardando até que haja um disponível.
+
+        Argumentos:
+        timeout -- Tempo máximo de espera em segundos (None aguarda indefinidamente).
+
+        Retorna:
+        item -- O item retirado, ou None se o buffer foi fechado ou o tempo de espera acabou.
+        """
+        with self._condicao:
+            self._condicao.wait_for(lambda: self._itens or self._fechado, timeout)
+            if not self._itens:
+                return None
+            # Libera a captura que aguarda espaço no buffer.
+            self._condicao.notify_all()
+            return self._itens.popleft()
+
+    def get_latest(self, timeout=None):
+        # Retira apenas o item mais recente, descartando os anteriores. Com bloquear, nenhum
+        # item é descartado e o mais antigo é retirado, como em get.
+        if self.bloquear:
+            return self.get(timeout)
+        with self._condicao:
+            self._condicao.wait_for(lambda: self._itens or self._fechado, timeout)
+            if not self._itens:
+                return None
+            item = self._itens.pop()
+            self.descartados += len(self._itens)
+            self._itens.clear()
+            return item
+
+    def close(self):
+        # Fecha o buffer, liberando quem estiver aguardando um item ou espaço no buffer.
+        with self._condicao:
+            self._fechado = True
+            self._condicao.notify_all()
+
+    def __len__(self):
+        with self._condicao:
+            return len(self._itens)
+
+    @property
+    def esgotado(self):
+        # Indica que o buffer foi fechado e que todos os itens já foram retirados.
+        with self._condicao:
+            return self._fechado and not self._itens
+
+# Thread que lê os frames da fonte de vídeo e os grava no buffer de captura.
+
+
+class CaptureThread(threading.Thread):
+    def __init__(self, video, buffer, relogio=None):
+        super().__init__(name="captura", daemon=True)
+        self.video = video
+        self.buffer = buffer
+        # Relógio dos frames (utils.RelogioVideo); sem ele, o instante é o de captura.
+        self.relogio = relogio
+        self._parar = threading.Event()
+
+    def run(self):
+        indice = 0
+        try:
+            while not self._parar.is_set():
+                ret, frame = self.video.read()
+                if not ret:
+                    break
+                timestamp = time.monotonic()
+                instante = self.relogio() if self.relogio is not None else timestamp
+                self.buffer.put(FrameCapturado(indice, timestamp, frame, instante))
+                indice += 1
+        finally:
+            self.buffer.close()
+
+    def parar(self):
+        self._parar.set()
+        # Libera a captura se ela estiver aguardando espaço em um buffer com bloquear.
+        self.buffer.close()
+
+# Thread que retira os frames do buffer de captura, processa cada um e grava o resultado
+# no buffer de saída.
+
+
+class InferenceThread(threading.Thread):
+    def __init__(self, entrada, saida, processar):
+        super().__init__(name="inferencia", daemon=True)
+        self.entrada = entrada
+        self.saida = saida
+        # Função que recebe um FrameCapturado e retorna o item a ser gravado na saída.
+        self.processar = processar
+        # Exceção que interrompeu a inferência, relançada na thread consumidora por verificar().
+        self.erro = None
+
+    def run(self):
+        try:
+            while True:
+                # Processa sempre o frame mais recente, descartando os que ficaram para trás.
+                capturado = self.entrada.get_latest()
+                if capturado is None:
+                    break
+                self.saida.put(self.processar(capturado))
+        except BaseException as erro:
+            self.erro = erro
+        finally:
+            self.saida.close()
+
+    def verificar(self):
+        # Relança a exceção da inferência, para que uma falha não seja confundida com o fim do
+        # vídeo quando o buffer de saída é fechado.
+        if self.erro is not None:
+            raise self.erro
@@ -0,0 +1,126 @@
+# quality_scheduler.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+from collections import namedtuple
+
+from face_tracker import TrackingFaceDetector
+from config import get_quality_scheduler_enabled, get_quality_latency_budget
+from config import get_quality_headroom, get_quality_initial_level
+
+# Descrição:
+# Este script implementa o escalonador adaptativo de qualidade.
+# O tempo de processamento de cada frame é medido e suavizado (média móvel exponencial); quando
+# ultrapassa o orçamento de latência (QUALITY_LATENCY_BUDGET), o escalonador desce um nível de
+# qualidade, reduzindo a resolução e a frequência da detecção de faces, o upsample do detector
+# e o desenho do overlay. Quando sobra folga (tempo abaixo de QUALITY_HEADROOM vezes o
+# orçamento), volta a subir. Assim o número de frames analisados dentro do TEMPO_ALERTA se mantém
+# mesmo em placas lentas. O nível atual é exibido no overlay e reportado nas métricas.
+
+# Parâmetros de um nível de qualidade:
+# escala -- Fator de redução do frame antes da detecção de faces.
+# intervalo -- Detecção completa a cada N frames (nos demais a face é rastreada).
+# upsample -- Número de upsamples do detector HOG do dlib.
+# olhos -- Se os contornos e pontos dos olhos são desenhados no overlay.
+NivelQualidade = namedtuple("NivelQualidade", ["escala", "intervalo", "upsample", "olhos"])
+
+# Níveis do mais alto (0) para o mais baixo. O número de níveis é validado em config.py
+# (NIVEIS_QUALIDADE), que não importa este módulo.
+NIVEIS = (
+    NivelQualidade(1.0, 1, 1, True),
+    NivelQualidade(1.0, 1, 0, True),
+    NivelQualidade(0.75, 5, 0, True),
+    NivelQualidade(0.5, 10, 0, False),
+    NivelQualidade(0.35, 20, 0, False),
+)
+
+# Peso de cada novo frame na média móvel do tempo de processamento.
+PESO_MEDIA = 0.1
+
+# Número mínimo de frames entre duas mudanças de nível, para que a média reflita o novo nível.
+FRAMES_ENTRE_MUDANCAS = 15
+
+
+class QualityScheduler:
+    def __init__(self, orcamento=0.1, folga=0.6, nivel_inicial=1, niveis=NIVEIS):
+        # Tempo máximo (s) de processamento de um frame.
+        self.orcamento = orcamento
+        # Fração do orçamento abaixo da qual a qualidade volta a subir.
+        self.folga = folga
+        self.niveis = niveis
+        self.nivel = min(max(0, nivel_inicial), len(niveis) - 1)
+        self.localizador = None
+        self.tempo_medio = None
+        self.frames_desde_mudanca = 0
+        self.mudancas = 0
+
+    @property
+    def atual(self):
+        return self.niveis[self.nivel]
+
+    def preparar(self, detector):
+        """
+        Passa a controlar o localizador de faces e aplica o nível atual.
+
+        Argumentos:
+        detector -- Detector de faces ou TrackingFaceDetector.
+
+        Retorna:
+        localizador -- TrackingFaceDetector controlado pelo escalonador. Um detector comum é
+                       envolvido no modo de rastreamento, para que a resolução e o intervalo
+                       da detecção possam ser ajustados.
+        """
+        if not isinstance(detector, TrackingFaceDetector):
+            detector = TrackingFaceDetector(detector, intervalo_deteccao=1, escala=1.0)
+        self.localizador = detector
+        self._aplicar()
+        return detector
+
+    def registrar(self, duracao):
+        # Registra o tempo de processamento (s) de um frame e ajusta o nível, se necessário.
+        if self.tempo_medio is None:
+            self.tempo_medio = duracao
+        else:
+            self.tempo_medio += PESO_MEDIA * (duracao - self.tempo_medio)
+        self.frames_desde_mudanca += 1
+        if self.frames_desde_mudanca < FRAMES_ENTRE_MUDANCAS:
+            return
+
+        if self.tempo_medio > self.orcamento and self.nivel < len(self.niveis) - 1:
+            self._mudar(self.nivel + 1)
+        elif self.tempo_medio < self.orcamento * self.folga and self.nivel > 0:
+            self._mudar(self.nivel - 1)
+
+    def _mudar(self, nivel):
+        self.nivel = nivel
+        self.frames_desde_mudanca = 0
+        self.mudancas += 1
+        self._aplicar()
+
+    def _aplicar(self):
+        if self.localizador is None:
+            return
+        nivel = self.atual
+        self.localizador.escala = nivel.escala
+        self.localizador.intervalo_deteccao = nivel.intervalo
+        # Apenas o detector HOG do dlib tem upsample.
+        if hasattr(self.localizador.detector, "upsample"):
+            self.localizador.detector.upsample = nivel.upsample
+
+    def valores(self):
+        return {"nivel_qualidade": self.nivel,
+                "tempo_medio_ms": (self.tempo_medio or 0.0) * 1000,
+                "orcamento_ms": self.orcamento * 1000,
+                "mudancas_nivel": self.mudancas}
+
+    def linha_overlay(self):
+        nivel = self.atual
+        return (f"Qualidade: {self.nivel}/{len(self.niveis) - 1} (escala {nivel.escala:.2f}, "
+                f"det. 1/{nivel.intervalo})  {(self.tempo_medio or 0.0) * 1000:.0f} ms")
+
+# Cria o escalonador de qualidade, se ativado no arquivo de configuração.
+
+
+def criar_escalonador_qualidade():
+    if not get_quality_scheduler_enabled():
+        return None
+    return QualityScheduler(get_quality_latency_budget(), get_quality_headroom(),
+                            get_quality_initial_level())
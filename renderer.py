@@ -0,0 +1,261 @@
+# renderer.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import logging
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+from utils import draw_eyes_points, mapa_pontos
+from config import get_render_mode, get_display_max_fps, get_render_preview_scale
+from config import get_render_record_path, get_render_record_fps, get_render_record_codec
+
+# Descrição:
+# Este script implementa a camada de renderização, separada do loop de detecção.
+# Há três modos, escolhidos em RENDER_MODE (e que podem ser combinados, como "preview,record"):
+# off -- nenhum desenho nem janela; é o modo das unidades sem tela e do Linux sem interface.
+# preview -- janela com o overlay, desenhada no máximo DISPLAY_MAX_FPS vezes por segundo sobre
+#            uma cópia reduzida do frame.
+# record -- grava o vídeo anotado em arquivo com o cv2.VideoWriter, em uma thread própria.
+# O loop de detecção pergunta ao renderizador se ele quer o frame atual antes de montar os textos
+# do overlay, de modo que não paga nenhum custo de renderização que não será usado.
+
+MODO_OFF = "off"
+MODO_PREVIEW = "preview"
+MODO_RECORD = "record"
+
+# Cor dos pontos e contornos dos olhos (RGB).
+COR_OLHOS_RGB = (0, 255, 0)
+
+# Número máximo de frames aguardando a gravação; quando cheio, os novos frames são descartados.
+CAPACIDADE_GRAVACAO = 32
+
+# Marcador colocado na fila para encerrar a thread de gravação.
+_FIM = object()
+
+logger = logging.getLogger("renderer")
+
+# Monta as linhas de texto do overlay: os textos de todos os consumidores, o FPS e as linhas extras.
+
+
+def montar_linhas(consumidores, fps, linhas_extras=()):
+    linhas = [linha for consumidor in consumidores
+              for linha in consumidor.linhas_overlay()]
+    linhas.append((f"Video FPS: {fps:.2f}", (255, 255, 255)))
+    linhas.extend((texto, (255, 255, 255)) for texto in linhas_extras)
+    return linhas
+
+# Desenha os olhos detectados e as linhas de texto sobre o frame.
+
+
+def desenhar_anotacoes(frame, landmarks, linhas, desenhar_olhos=True, escala=1.0):
+    cor_bgr = (COR_OLHOS_RGB[2], COR_OLHOS_RGB[1], COR_OLHOS_RGB[0])
+    for pontos in (landmarks if desenhar_olhos else ()):
+        # Em um frame reduzido, os pontos são convertidos para a nova escala.
+        if escala != 1.0:
+            pontos = (pontos * escala).astype(np.int32)
+        # Os seis pontos de cada olho já formam um contorno convexo, desenhado sem copiar os pontos.
+        mapa = mapa_pontos(len(pontos))
+        cv2.polylines(frame, [pontos[mapa.olho_esquerdo], pontos[mapa.olho_direito]], True, cor_bgr, 1)
+        draw_eyes_points(frame, pontos, COR_OLHOS_RGB)
+
+    fonte = cv2.FONT_HERSHEY_SIMPLEX
+    cv2.rectangle(frame, (10, 20), (550, 30 + 30 * len(linhas)), (0, 0, 0), -1)
+    for i, (texto, cor) in enumerate(linhas):
+        cv2.putText(frame, texto, (20, 50 + 30 * i), fonte, 0.7, cor, 2)
+
+# Classe base dos renderizadores.
+
+
+class Renderizador:
+    def quer_quadro(self, agora):
+        """
+        Indica se o renderizador vai usar o frame atual. Quando retorna False, o loop de
+        detecção não monta o overlay nem chama renderizar.
+
+        Argumentos:
+        agora -- Instante atual (time.monotonic).
+        """
+        return False
+
+    def renderizar(self, frame, landmarks, linhas, desenhar_olhos=True):
+        """
+        Renderiza um frame. O frame não é alterado: cada renderizador desenha em uma cópia.
+
+        Argumentos:
+        frame -- Frame BGR processado.
+        landmarks -- Pontos faciais (arrays (68, 2), ou (12, 2) no modelo só dos olhos) do frame.
+        linhas -- Linhas de texto (texto, cor) do overlay, montadas por montar_linhas.
+        desenhar_olhos -- Se os contornos e pontos dos olhos são desenhados.
+        """
+        pass
+
+    def continuar(self):
+        # Retorna False quando o usuário pediu para encerrar (tecla 'q' na janela).
+        return True
+
+    def fechar(self):
+        pass
+
+# Modo off: nada é desenhado nem exibido.
+
+
+class RenderizadorNulo(Renderizador):
+    pass
+
+# Modo preview: exibe o overlay em uma janela, com taxa limitada e sobre uma cópia reduzida.
+
+
+class PreviewRenderer(Renderizador):
+    def __init__(self, titulo_janela, max_fps=30, escala=1.0):
+        self.titulo_janela = titulo_janela
+        self.intervalo = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.escala = escala
+        self._ultima_exibicao = None
+        self._sair = False
+        # Tela reutilizada entre frames, onde o overlay é desenhado sem alterar o frame.
+        self._tela = None
+        # A janela só existe depois do primeiro cv2.imshow.
+        self._janela_aberta = False
+
+    def quer_quadro(self, agora):
+        return self._ultima_exibicao is None or agora - self._ultima_exibicao >= self.intervalo
+
+    def renderizar(self, frame, landmarks, linhas, desenhar_olhos=True):
+        self._ultima_exibicao = time.monotonic()
+        altura, largura = frame.shape[:2]
+        forma = (round(altura * self.escala), round(largura * self.escala)) + frame.shape[2:]
+        if self._tela is None or self._tela.shape != forma:
+            self._tela = np.empty(forma, dtype=frame.dtype)
+        if self.escala != 1.0:
+            cv2.resize(frame, (forma[1], forma[0]), dst=self._tela, interpolation=cv2.INTER_AREA)
+        else:
+            np.copyto(self._tela, frame)
+        desenhar_anotacoes(self._tela, landmarks, linhas, desenhar_olhos, self.escala)
+        cv2.imshow(self.titulo_janela, self._tela)
+        self._janela_aberta = True
+
+        # Permite sair do loop pressionando 'q'.
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            self._sair = True
+
+    def continuar(self):
+        return not self._sair
+
+    def fechar(self):
+        # Sem nenhum frame exibido, a janela não existe e o destroyWindow falharia.
+        if self._janela_aberta:
+            cv2.destroyWindow(self.titulo_janela)
+            self._janela_aberta = False
+
+# Modo record: grava o vídeo anotado. O desenho e a codificação rodam em uma thread própria;
+# o loop de detecção apenas copia o frame e o coloca na fila. Com uma câmera, os frames que não
+# cabem na fila são descartados para não atrasar a detecção; com um arquivo de vídeo (bloquear),
+# o loop aguarda a gravação, de modo que o vídeo gravado tem todos os frames.
+
+
+class RecordRenderer(Renderizador):
+    def __init__(self, caminho, fps=30.0, codec="MJPG", bloquear=False):
+        self.caminho = caminho
+        self.fps = fps
+        self.codec = codec
+        self.bloquear = bloquear
+        self.gravados = 0
+        self.descartados = 0
+        self._escritor = None
+        self._fila = queue.Queue(CAPACIDADE_GRAVACAO)
+        self._thread = threading.Thread(target=self._gravar, name="gravacao", daemon=True)
+        self._thread.start()
+
+    def quer_quadro(self, agora):
+        return True
+
+    def renderizar(self, frame, landmarks, linhas, desenhar_olhos=True):
+        # O frame e os pontos são copiados, pois os buffers do loop podem ser reutilizados.
+        item = (frame.copy(), [pontos.copy() for pontos in landmarks], linhas, desenhar_olhos)
+        if self.bloquear:
+            self._fila.put(item)
+            return
+        try:
+            self._fila.put_nowait(item)
+        except queue.Full:
+            self.descartados += 1
+            # Avisa no primeiro descarte, e não apenas ao final da gravação.
+            if self.descartados == 1:
+                logger.warning("Gravação atrasada: frames estão sendo descartados (%s).",
+                               self.caminho)
+
+    def _gravar(self):
+        while True:
+            item = self._fila.get()
+            if item is _FIM:
+                break
+            frame, landmarks, linhas, desenhar_olhos = item
+            desenhar_anotacoes(frame, landmarks, linhas, desenhar_olhos)
+            if self._escritor is None:
+                altura, largura = frame.shape[:2]
+                self._escritor = cv2.VideoWriter(
+                    self.caminho, cv2.VideoWriter_fourcc(*self.codec), self.fps, (largura, altura))
+                if not self._escritor.isOpened():
+                    logger.error("Erro ao abrir o arquivo de gravação: %s", self.caminho)
+            self._escritor.write(frame)
+            self.gravados += 1
+
+        if self._escritor is not None:
+            self._escritor.release()
+
+    def fechar(self):
+        # Aguarda a gravação dos frames que já estão na fila.
+        self._fila.put(_FIM)
+        self._thread.join()
+        if self.descartados:
+            logger.warning("Gravação: %d frames gravados, %d descartados por atraso da gravação.",
+                           self.gravados, self.descartados)
+
+# Combina vários renderizadores, como preview e record ao mesmo tempo.
+
+
+class RenderizadorComposto(Renderizador):
+    def __init__(self, renderizadores):
+        self.renderizadores = renderizadores
+        self._selecionados = []
+
+    def quer_quadro(self, agora):
+        self._selecionados = [renderizador for renderizador in self.renderizadores
+                              if renderizador.quer_quadro(agora)]
+        return bool(self._selecionados)
+
+    def renderizar(self, frame, landmarks, linhas, desenhar_olhos=True):
+        for renderizador in self._selecionados:
+            renderizador.renderizar(frame, landmarks, linhas, desenhar_olhos)
+
+    def continuar(self):
+        return all(renderizador.continuar() for renderizador in self.renderizadores)
+
+    def fechar(self):
+        for renderizador in self.renderizadores:
+            renderizador.fechar()
+
+# Cria o renderizador dos modos escolhidos no arquivo de configuração.
+
+
+def criar_renderizador(titulo_janela, fps_fonte=0, fonte_arquivo=False):
+    renderizadores = []
+    for modo in get_render_mode():
+        if modo == MODO_OFF:
+            continue
+        if modo == MODO_PREVIEW:
+            renderizadores.append(PreviewRenderer(
+                titulo_janela, get_display_max_fps(), get_render_preview_scale()))
+        elif modo == MODO_RECORD:
+            renderizadores.append(RecordRenderer(
+                get_render_record_path(), get_render_record_fps() or fps_fonte or 30.0,
+                get_render_record_codec(), bloquear=fonte_arquivo))
+        else:
+            raise ValueError(f"Modo de renderização desconhecido: {modo}")
+    if not renderizadores:
+        return RenderizadorNulo()
+    if len(renderizadores) == 1:
+        return renderizadores[0]
+    return RenderizadorComposto(renderizadores)
@@ -0,0 +1,191 @@
+# servidor_metricas.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from config import get_metrics_server_enabled, get_metrics_server_address
+from config import get_metrics_push_interval
+
+# Descrição:
+# Este script publica as métricas de cada fluxo de vídeo em um servidor HTTP local (asyncio),
+# para que o gateway de telemetria e os painéis da frota não precisem do vídeo.
+# O loop de frames apenas substitui, no máximo uma vez por intervalo, o dicionário com a amostra
+# mais recente do seu fluxo (EAR, PERCLOS, piscadas, alerta, FPS, latência de cada etapa e frames
+# descartados); o servidor roda em uma thread própria e nunca bloqueia o loop.
+#
+# Endpoints:
+#   GET /metrics        -- texto no formato do Prometheus.
+#   GET /metricas.json  -- última amostra de cada fluxo, em JSON.
+#   GET /eventos        -- Server-Sent Events: a amostra de cada fluxo, em JSON, a cada intervalo.
+
+# Prefixo dos nomes das métricas no formato do Prometheus.
+PREFIXO_PROMETHEUS = "sonolencia_"
+
+# Tamanho máximo aceito para a requisição HTTP (linha inicial e cabeçalhos).
+TAMANHO_MAXIMO_REQUISICAO = 8192
+
+logger = logging.getLogger("servidor_metricas")
+
+# Guarda a amostra mais recente das métricas de cada fluxo de vídeo.
+
+
+class PainelMetricas:
+    def __init__(self, intervalo=1.0):
+        # Intervalo mínimo (s) entre duas amostras do mesmo fluxo.
+        self.intervalo = intervalo
+        self._amostras = {}
+        self._ultimas = {}
+
+    def publicar(self, fluxo, motor, resultado, fps=0.0, extras=None):
+        """
+        Publica a amostra atual de um fluxo. Chamado pelo loop de frames: fora do intervalo
+        retorna imediatamente, e a amostra é trocada de uma só vez, sem travas.
+
+        Argumentos:
+        fluxo -- Nome do fluxo de vídeo.
+        motor -- FusedEngine do fluxo.
+        resultado -- ResultadoFrame do frame atual.
+        fps -- Taxa de frames processados do fluxo.
+        extras -- Dicionário com valores adicionais (por exemplo, frames descartados).
+        """
+        agora = time.monotonic()
+        ultima = self._ultimas.get(fluxo)
+        if ultima is not None and agora - ultima < self.intervalo:
+            return
+        self._ultimas[fluxo] = agora
+
+        valores = {"timestamp": resultado.timestamp, "ear": resultado.ear,
+                   "alerta": resultado.alerta, "faces": len(resultado.faces), "fps": fps}
+        for consumidor in motor.consumidores:
+            valores.update(consumidor.valores())
+        for etapa, duracao in motor.cronometro.ultimas.items():
+            valores[f"latencia_{etapa}_ms"] = duracao * 1000
+        valores.update(motor.valores_deteccao())
+        if motor.portao is not None:
+            valores["landmarks_reutilizados"] = motor.portao.taxa_acerto
+        if motor.escalonador is not None:
+            valores["nivel_qualidade"] = motor.escalonador.nivel
+        if extras:
+            valores.update(extras)
+
+        # Mantém apenas os valores numéricos; os booleanos viram 0 ou 1.
+        self._amostras[fluxo] = {nome: int(valor) if isinstance(valor, bool) else valor
+                                 for nome, valor in valores.items()
+                                 if isinstance(valor, (int, float))}
+
+    def amostras(self):
+        # Cópia do dicionário {fluxo: amostra}, feita de uma só vez.
+        return dict(self._amostras)
+
+# Formata as amostras no formato de texto do Prometheus.
+
+
+def texto_prometheus(amostras):
+    nomes = sorted({nome for valores in amostras.values() for nome in valores})
+    linhas = []
+    for nome in nomes:
+        linhas.append(f"# TYPE {PREFIXO_PROMETHEUS}{nome} gauge")
+        for fluxo, valores in sorted(amostras.items()):
+            if nome in valores:
+                rotulo = fluxo.replace("\\", "\\\\").replace('"', '\\"')
+                linhas.append(f'{PREFIXO_PROMETHEUS}{nome}{{fluxo="{rotulo}"}} {valores[nome]:g}')
+    return "\n".join(linhas) + "\n"
+
+
+class MetricsServer(threading.Thread):
+    def __init__(self, painel, host="127.0.0.1", porta=9100, intervalo=1.0):
+        super().__init__(name="servidor-metricas", daemon=True)
+        self.painel = painel
+        self.host = host
+        self.porta = porta
+        # Intervalo (s) entre dois envios do fluxo de eventos.
+        self.intervalo = intervalo
+        self._loop = None
+        self._parar = None
+        self._pronto = threading.Event()
+
+    def run(self):
+        try:
+            asyncio.run(self._servir())
+        except Exception:
+            logger.exception("Falha no servidor de métricas")
+        finally:
+            self._pronto.set()
+
+    async def _servir(self):
+        self._loop = asyncio.get_running_loop()
+        self._parar = asyncio.Event()
+        servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        self._pronto.set()
+        async with servidor:
+            await self._parar.wait()
+
+    async def _atender(self, reader, writer):
+        try:
+            requisicao = await reader.readuntil(b"\r\n\r\n")
+            if len(requisicao) > TAMANHO_MAXIMO_REQUISICAO:
+                raise ValueError("Requisição muito longa")
+            partes = requisicao.split(b"\r\n", 1)[0].decode("latin-1").split()
+            metodo, caminho = (partes + ["", ""])[:2]
+            caminho = caminho.split("?", 1)[0]
+
+            if metodo != "GET":
+                await self._responder(writer, "405 Method Not Allowed", "text/plain", "")
+            elif caminho == "/metrics":
+                await self._responder(writer, "200 OK", "text/plain; version=0.0.4",
+                                      texto_prometheus(self.painel.amostras()))
+            elif caminho == "/metricas.json":
+                await self._responder(writer, "200 OK", "application/json",
+                                      json.dumps(self.painel.amostras(), separators=(",", ":")))
+            elif caminho == "/eventos":
+                await self._enviar_eventos(writer)
+            else:
+                await self._responder(writer, "404 Not Found", "text/plain", "")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _responder(writer, status, tipo, corpo):
+        dados = corpo.encode("utf-8")
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {tipo}\r\n"
+                     f"Content-Length: {len(dados)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+                     + dados)
+        await writer.drain()
+
+    async def _enviar_eventos(self, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+        while not self._parar.is_set():
+            for fluxo, valores in self.painel.amostras().items():
+                dados = json.dumps(dict(valores, fluxo=fluxo), separators=(",", ":"))
+                writer.write(f"data: {dados}\n\n".encode("utf-8"))
+            await writer.drain()
+            try:
+                await asyncio.wait_for(self._parar.wait(), self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+
+    def encerrar(self):
+        # Encerra o servidor e as conexões abertas a partir de outra thread.
+        self._pronto.wait()
+        if self._loop is not None and self._parar is not None:
+            self._loop.call_soon_threadsafe(self._parar.set)
+        self.join()
+
+# Cria o painel e inicia o servidor de métricas, se ativado no arquivo de configuração.
+
+
+def iniciar_servidor_metricas():
+    if not get_metrics_server_enabled():
+        return None, None
+    intervalo = get_metrics_push_interval()
+    painel = PainelMetricas(intervalo)
+    host, porta = get_metrics_server_address()
+    servidor = MetricsServer(painel, host, porta, intervalo)
+    servidor.start()
+    return painel, servidor
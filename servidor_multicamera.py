@@ -0,0 +1,218 @@
+# servidor_multicamera.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import argparse
+import threading
+import time
+
+from utils import initialize_video, initialize_predictor, ContadorFPS, criar_relogio_video
+from config import get_ear_threshold, get_tempo_alerta, get_video_sources
+from config import get_server_workers, get_server_report_interval
+from config import adicionar_argumentos_configuracao, aplicar_argumentos_configuracao
+from config import iniciar_recarga_automatica
+from metricas import TECNICAS, criar_consumidores
+from fused_detector import FusedEngine
+from face_detectors import criar_detector_faces
+from face_tracker import criar_localizador_faces
+from landmark_gate import criar_portao_landmarks
+from driver_selector import criar_seletor_motorista
+from quality_scheduler import criar_escalonador_qualidade
+from pipeline import LatestFrameBuffer, CaptureThread
+from alertas import criar_sinks_alertas, criar_despachante_alertas, fechar_sinks
+from servidor_metricas import iniciar_servidor_metricas
+
+# Descrição:
+# Este script monitora várias câmeras (ou motoristas) em um único processo, sem interface gráfica.
+# O preditor de pontos faciais (~100 MB) é carregado uma única vez e compartilhado por um número
+# fixo de threads de inferência, que atendem as fontes de vídeo em rodízio (round-robin), de modo
+# que nenhuma fonte monopolize os workers. Cada fonte mantém o seu próprio estado de detecção
+# (detector/rastreador de faces, temporizador do EAR, janela do PERCLOS e contador de piscadas)
+# e a sua própria thread de captura, e a vazão e o backlog de cada fonte são reportados
+# periodicamente.
+#
+# Exemplo de uso:
+#   python servidor_multicamera.py 0 1 rtsp://camera-baia-3/stream --workers 4
+
+# Tempo de espera de um worker quando nenhuma fonte tem frame disponível.
+ESPERA_SEM_FRAMES = 0.005
+
+
+class FluxoVideo:
+    def __init__(self, nome, fonte, predictor, sinks, tecnicas=TECNICAS, painel=None):
+        self.nome = nome
+        # Painel do servidor de métricas (servidor_metricas.py), ou None.
+        self.painel = painel
+        self.video = initialize_video(fonte)
+        relogio = criar_relogio_video(self.video, fonte)
+        # Apenas o frame mais recente de cada câmera aguarda a inferência; em arquivos de vídeo
+        # a captura aguarda o worker, para que nenhum frame seja descartado.
+        self.buffer = LatestFrameBuffer(1, bloquear=relogio.arquivo)
+        self.captura = CaptureThread(self.video, self.buffer, relogio)
+
+        # O detector de faces (e o rastreador) guarda estado, por isso é criado por fonte;
+        # o preditor de pontos faciais é compartilhado.
+        consumidores = criar_consumidores(
+            tecnicas, get_ear_threshold(), get_tempo_alerta())
+        localizador = criar_localizador_faces(criar_detector_faces())
+        escalonador = criar_escalonador_qualidade()
+        if escalonador is not None:
+            localizador = escalonador.preparar(localizador)
+        self.motor = FusedEngine(localizador, predictor, consumidores,
+                                 portao=criar_portao_landmarks(),
+                                 seletor=criar_seletor_motorista(), escalonador=escalonador)
+        self.despachante = criar_despachante_alertas(sinks, nome)
+
+        # Indica que um worker está processando um frame desta fonte; garante que os frames
+        # de uma mesma fonte sejam processados em ordem, por um worker de cada vez.
+        self.ocupado = False
+        self.processados = 0
+        self.latencia = 0.0
+        self.contador_fps = ContadorFPS()
+        # Início da captura e instante do último frame processado, usados na vazão do relatório.
+        self.inicio = None
+        self.ultimo_frame = None
+
+    def iniciar(self):
+        self.inicio = time.monotonic()
+        self.captura.start()
+
+    def processar(self, capturado):
+        inicio = time.perf_counter()
+        resultado = self.motor.processar_frame(capturado.frame, capturado.instante)
+        if self.motor.escalonador is not None:
+            self.motor.escalonador.registrar(time.perf_counter() - inicio)
+        self.motor.notificar(self.despachante, resultado)
+        self.latencia = time.monotonic() - capturado.timestamp
+        self.ultimo_frame = time.monotonic()
+        self.contador_fps.atualizar(self.ultimo_frame)
+        self.processados += 1
+        if self.painel is not None:
+            self.painel.publicar(self.nome, self.motor, resultado, self.contador_fps.fps, {
+                "latencia_captura_ms": self.latencia * 1000,
+                "frames_processados": self.processados,
+                "frames_descartados": self.buffer.descartados,
+                "backlog": len(self.buffer)})
+
+    @property
+    def vazao(self):
+        # Frames processados por segundo desde o início da captura até o último frame; ao
+        # contrário do ContadorFPS, vale também em execuções curtas e no relatório final.
+        if self.ultimo_frame is None or self.ultimo_frame <= self.inicio:
+            return 0.0
+        return self.processados / (self.ultimo_frame - self.inicio)
+
+    def relatorio(self):
+        texto = (f"{self.nome}: {self.vazao:.1f} FPS, {self.processados} frames, "
+                 f"backlog {len(self.buffer)}, descartados {self.buffer.descartados}, "
+                 f"latência {self.latencia * 1000:.0f} ms")
+        if self.motor.portao is not None:
+            texto += f", landmarks reutilizados {self.motor.portao.taxa_acerto * 100:.0f}%"
+        if self.motor.escalonador is not None:
+            texto += f", nível de qualidade {self.motor.escalonador.nivel}"
+        return texto
+
+    def encerrar(self):
+        self.captura.parar()
+        self.captura.join()
+        self.video.release()
+        self.despachante.encerrar()
+
+
+class MultiStreamServer:
+    def __init__(self, fluxos, workers=2):
+        self.fluxos = fluxos
+        self.workers = [threading.Thread(target=self._worker, name=f"worker-{i}", daemon=True)
+                        for i in range(max(1, workers))]
+        self._trava = threading.Lock()
+        self._proximo = 0
+        self._parar = threading.Event()
+
+    def _proxima_tarefa(self):
+        # Procura, em rodízio a partir da fonte seguinte à última atendida, uma fonte livre
+        # com um frame disponível.
+        with self._trava:
+            for deslocamento in range(len(self.fluxos)):
+                indice = (self._proximo + deslocamento) % len(self.fluxos)
+                fluxo = self.fluxos[indice]
+                if fluxo.ocupado:
+                    continue
+                capturado = fluxo.buffer.get_latest(timeout=0)
+                if capturado is not None:
+                    fluxo.ocupado = True
+                    self._proximo = indice + 1
+                    return fluxo, capturado
+        return None
+
+    def _worker(self):
+        while not self._parar.is_set():
+            tarefa = self._proxima_tarefa()
+            if tarefa is None:
+                # Encerra quando todas as fontes terminaram e não há mais frames.
+                if all(fluxo.buffer.esgotado for fluxo in self.fluxos):
+                    break
+                time.sleep(ESPERA_SEM_FRAMES)
+                continue
+            fluxo, capturado = tarefa
+            try:
+                fluxo.processar(capturado)
+            finally:
+                fluxo.ocupado = False
+
+    def executar(self, intervalo_relatorio=10.0):
+        for fluxo in self.fluxos:
+            fluxo.iniciar()
+        for worker in self.workers:
+            worker.start()
+
+        try:
+            while any(worker.is_alive() for worker in self.workers):
+                for worker in self.workers:
+                    worker.join(intervalo_relatorio / len(self.workers))
+                for fluxo in self.fluxos:
+                    print(fluxo.relatorio())
+        except KeyboardInterrupt:
+            print("Encerrando o servidor...")
+        finally:
+            self._parar.set()
+            for worker in self.workers:
+                worker.join()
+            for fluxo in self.fluxos:
+                fluxo.encerrar()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Monitora várias fontes de vídeo com um preditor e um pool de workers compartilhados.")
+    parser.add_argument("fontes", nargs="*",
+                        help="Fontes de vídeo (padrão: VIDEO_SOURCES do config.ini).")
+    parser.add_argument("--workers", type=int,
+                        help="Threads de inferência (padrão: SERVER_WORKERS do config.ini).")
+    parser.add_argument("--tecnicas", nargs="+", choices=TECNICAS, default=list(TECNICAS))
+    adicionar_argumentos_configuracao(parser)
+    args = parser.parse_args()
+    aplicar_argumentos_configuracao(args)
+    # Aplica as alterações do config.ini às fontes em execução, se configurado.
+    iniciar_recarga_automatica()
+
+    fontes = [int(fonte) if fonte.isdigit() else fonte for fonte in args.fontes]
+    fontes = fontes or get_video_sources()
+
+    # O preditor e os destinos de alerta (por exemplo, o som decodificado) são carregados
+    # uma única vez e compartilhados por todas as fontes.
+    predictor = initialize_predictor()
+    sinks = criar_sinks_alertas()
+    # Servidor local de métricas, com uma amostra por fonte, se ativado.
+    painel, servidor_metricas = iniciar_servidor_metricas()
+    fluxos = [FluxoVideo(f"fonte-{i}:{fonte}", fonte, predictor, sinks, args.tecnicas, painel)
+              for i, fonte in enumerate(fontes)]
+
+    try:
+        MultiStreamServer(fluxos, args.workers or get_server_workers()).executar(
+            get_server_report_interval())
+    finally:
+        fechar_sinks(sinks)
+        if servidor_metricas is not None:
+            servidor_metricas.encerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+# treinar_preditor_olhos.py
+# Importa as bibliotecas necessárias para o funcionamento do script.
+import argparse
+import json
+import os
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+import cv2
+import dlib
+import numpy as np
+from utils import initialize_video, shape_para_array, calcular_ear_lote
+from utils import mapa_pontos, MAPA_68, MAPA_OLHOS
+from config import get_predictor_path, get_ear_threshold
+from config import adicionar_argumentos_configuracao, aplicar_argumentos_configuracao
+from face_detectors import criar_detector_faces
+from driver_selector import criar_seletor_motorista
+from cronometro import StageTimer
+
+# Descrição:
+# Este script treina e avalia o modelo compacto de pontos faciais apenas dos olhos.
+# O detector usa somente os pontos 36 a 47 do modelo de 68 pontos; um shape_predictor treinado
+# apenas com esses 12 pontos é bem menor, carrega mais rápido, ocupa menos memória e roda mais
+# rápido a cada frame. Para usá-lo, basta apontar PREDICTOR_PATH para o arquivo gerado: o número
+# de pontos do modelo é lido ao carregá-lo e o restante do código usa o mapa de índices
+# correspondente (ver utils.mapa_pontos).
+#
+# Comandos:
+#   converter -- Reduz um XML de anotações de 68 pontos (formato do dlib/iBUG 300-W) aos 12
+#                pontos dos olhos, renumerados de 00 a 11.
+#   treinar   -- Converte as anotações e treina o modelo com dlib.train_shape_predictor.
+#   comparar  -- Roda os dois modelos sobre as mesmas faces de um vídeo e compara o tempo de
+#                carregamento e de predição, o tamanho do arquivo e a concordância do EAR.
+#
+# Exemplos de uso:
+#   python treinar_preditor_olhos.py treinar labels_ibug_300W_train.xml olhos.dat \
+#       --teste labels_ibug_300W_test.xml
+#   python treinar_preditor_olhos.py comparar gravacao.mp4 olhos.dat --saida comparacao.json
+
+# Índices, no modelo de 68 pontos, dos pontos mantidos no modelo só dos olhos (na ordem).
+INDICES_OLHOS_68 = tuple(range(MAPA_68.num_pontos)[MAPA_68.olhos])
+
+# Parâmetros padrão do treinamento. A profundidade das árvores é menor que a padrão do dlib (4),
+# o que reduz o tamanho do modelo; os demais valores são os padrões do dlib.
+PROFUNDIDADE_ARVORE = 3
+PROFUNDIDADE_CASCATA = 10
+NU = 0.1
+SOBREAMOSTRAGEM = 20
+PONTOS_CANDIDATOS = 400
+DIVISOES_TESTE = 20
+
+# Reduz um XML de anotações de 68 pontos aos pontos dos olhos.
+
+
+def converter_anotacoes(entrada, saida, indices=INDICES_OLHOS_68):
+    """
+    Converte um XML de anotações do dlib com 68 pontos por face em um XML só com os olhos.
+
+    Argumentos:
+    entrada -- XML de anotações de 68 pontos (como o labels_ibug_300W_train.xml).
+    saida -- XML gerado. Os caminhos das imagens são gravados como absolutos, de modo que o
+             arquivo pode ficar em qualquer diretório.
+    indices -- Índices dos pontos mantidos, renumerados de 0 em diante na ordem informada.
+
+    Retorna:
+    contagem -- Tupla (imagens, faces, faces_descartadas). Faces sem todos os pontos dos
+                olhos anotados são descartadas.
+    """
+    arvore = ET.parse(entrada)
+    raiz = arvore.getroot()
+    diretorio = os.path.dirname(os.path.abspath(entrada))
+    novos_nomes = {indice: f"{novo:02d}" for novo, indice in enumerate(indices)}
+
+    imagens = raiz.find("images")
+    total_imagens = total_faces = descartadas = 0
+    for imagem in list(imagens):
+        imagem.set("file", os.path.join(diretorio, imagem.get("file")))
+        for caixa in list(imagem.findall("box")):
+            partes = {int(parte.get("name")): parte for parte in caixa.findall("part")}
+            if not all(indice in partes for indice in indices):
+                imagem.remove(caixa)
+                descartadas += 1
+                continue
+            for numero, parte in partes.items():
+                if numero in novos_nomes:
+                    parte.set("name", novos_nomes[numero])
+                else:
+                    caixa.remove(parte)
+            # As partes são regravadas na ordem do novo modelo.
+            for parte in sorted(caixa.findall("part"), key=lambda parte: parte.get("name")):
+                caixa.remove(parte)
+                caixa.append(parte)
+            total_faces += 1
+        if imagem.find("box") is None:
+            imagens.remove(imagem)
+        else:
+            total_imagens += 1
+
+    arvore.write(saida, encoding="utf-8", xml_declaration=True)
+    return total_imagens, total_faces, descartadas
+
+# Cria as opções de treinamento do dlib.shape_predictor.
+
+
+def criar_opcoes_treino(profundidade_arvore=PROFUNDIDADE_ARVORE,
+                        profundidade_cascata=PROFUNDIDADE_CASCATA, nu=NU,
+                        sobreamostragem=SOBREAMOSTRAGEM, pontos_candidatos=PONTOS_CANDIDATOS,
+                        divisoes_teste=DIVISOES_TESTE, threads=None):
+    opcoes = dlib.shape_predictor_training_options()
+    opcoes.tree_depth = profundidade_arvore
+    opcoes.cascade_depth = profundidade_cascata
+    opcoes.nu = nu
+    opcoes.oversampling_amount = sobreamostragem
+    opcoes.feature_pool_size = pontos_candidatos
+    opcoes.num_test_splits = divisoes_teste
+    opcoes.num_threads = threads or os.cpu_count() or 1
+    opcoes.be_verbose = True
+    return opcoes
+
+
+def treinar_modelo(anotacoes, saida, opcoes, anotacoes_teste=None):
+    """
+    Treina o modelo só dos olhos a partir de anotações de 68 pontos.
+
+    Argumentos:
+    anotacoes -- XML de anotações de 68 pontos usado no treinamento.
+    saida -- Arquivo .dat do modelo gerado.
+    opcoes -- dlib.shape_predictor_training_options (ver criar_opcoes_treino).
+    anotacoes_teste -- XML de anotações de 68 pontos usado na avaliação (opcional).
+
+    Retorna:
+    erros -- Dicionário com o erro médio (em pixels) no treino e, se houver, no teste.
+    """
+    erros = {}
+    with tempfile.TemporaryDirectory() as temporario:
+        treino = os.path.join(temporario, "treino_olhos.xml")
+        print("Treino: %d imagens, %d faces (%d descartadas)" % converter_anotacoes(anotacoes, treino))
+        dlib.train_shape_predictor(treino, saida, opcoes)
+        erros["erro_treino"] = dlib.test_shape_predictor(treino, saida)
+
+        if anotacoes_teste:
+            teste = os.path.join(temporario, "teste_olhos.xml")
+            print("Teste: %d imagens, %d faces (%d descartadas)"
+                  % converter_anotacoes(anotacoes_teste, teste))
+            erros["erro_teste"] = dlib.test_shape_predictor(teste, saida)
+    return erros
+
+# Carrega um modelo medindo o tempo de leitura do arquivo.
+
+
+def _carregar_medindo(caminho):
+    inicio = time.perf_counter()
+    predictor = dlib.shape_predictor(caminho)
+    return predictor, time.perf_counter() - inicio
+
+
+def comparar_modelos(video, caminho_completo, caminho_olhos, max_frames=None, ear_threshold=0.2):
+    """
+    Roda o modelo de 68 pontos e o modelo só dos olhos sobre as mesmas faces de um vídeo.
+
+    Argumentos:
+    video -- Fonte de vídeo com o método read(), como o cv2.VideoCapture.
+    caminho_completo -- Arquivo .dat do modelo de 68 pontos.
+    caminho_olhos -- Arquivo .dat do modelo só dos olhos.
+    max_frames -- Número máximo de frames processados (padrão: o vídeo inteiro).
+    ear_threshold -- Limiar usado na concordância do estado dos olhos (aberto ou fechado).
+
+    Retorna:
+    resultado -- Dicionário com o tempo de carregamento, o tamanho do arquivo e o resumo da
+                 latência de cada modelo, a aceleração e a concordância do EAR.
+    """
+    modelos = {"modelo_68": caminho_completo, "modelo_olhos": caminho_olhos}
+    preditores = {}
+    resultado = {"modelos": {}}
+    for nome, caminho in modelos.items():
+        predictor, carregamento = _carregar_medindo(caminho)
+        preditores[nome] = predictor
+        resultado["modelos"][nome] = {"arquivo": caminho,
+                                      "pontos": mapa_pontos(predictor.num_parts).num_pontos,
+                                      "tamanho_mb": os.path.getsize(caminho) / 2 ** 20,
+                                      "carregamento_ms": carregamento * 1000}
+
+    detector = criar_detector_faces()
+    seletor = criar_seletor_motorista()
+    cronometro = StageTimer(guardar_amostras=True)
+    ears = {nome: [] for nome in modelos}
+    frames = 0
+    while max_frames is None or frames < max_frames:
+        ret, frame = video.read()
+        if not ret:
+            break
+        frames += 1
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = detector(gray)
+        if seletor is not None:
+            faces = seletor(faces, gray.shape)
+        for face in faces:
+            # A ordem dos modelos alterna a cada frame, para que o cache não favoreça nenhum deles.
+            for nome in (modelos if frames % 2 else reversed(list(modelos))):
+                with cronometro.etapa(nome):
+                    shape = preditores[nome](gray, face)
+                ears[nome].append(float(calcular_ear_lote(shape_para_array(shape))))
+
+    resultado["frames"] = frames
+    resultado["faces"] = len(ears["modelo_68"])
+    latencias = cronometro.resumo()
+    for nome in modelos:
+        resultado["modelos"][nome]["latencia"] = latencias.get(nome)
+    if not ears["modelo_68"]:
+        return resultado
+
+    completo, olhos = np.asarray(ears["modelo_68"]), np.asarray(ears["modelo_olhos"])
+    diferenca = np.abs(olhos - completo)
+    resultado["aceleracao"] = latencias["modelo_68"]["media_ms"] / latencias["modelo_olhos"]["media_ms"]
+    resultado["ear"] = {
+        "diferenca_media": float(diferenca.mean()),
+        "diferenca_p95": float(np.percentile(diferenca, 95)),
+        "correlacao": float(np.corrcoef(completo, olhos)[0, 1]) if len(completo) > 1 else 1.0,
+        # Fração das faces em que os dois modelos concordam se os olhos estão fechados.
+        "concordancia_olhos_fechados": float(np.mean((completo < ear_threshold)
+                                                     == (olhos < ear_threshold))),
+        "ear_threshold": ear_threshold,
+    }
+    return resultado
+
+# Exibe o resultado da comparação em forma de tabela.
+
+
+def exibir_comparacao(resultado):
+    print(f"Frames: {resultado['frames']}  Faces comparadas: {resultado['faces']}")
+    print(f"{'modelo':<14}{'pontos':>7}{'MB':>8}{'carga':>9}{'media':>9}{'p95':>9}   (ms)")
+    for nome, modelo in resultado["modelos"].items():
+        latencia = modelo["latencia"] or {"media_ms": 0.0, "p95_ms": 0.0}
+        print(f"{nome:<14}{modelo['pontos']:>7}{modelo['tamanho_mb']:>8.1f}"
+              f"{modelo['carregamento_ms']:>9.1f}{latencia['media_ms']:>9.3f}{latencia['p95_ms']:>9.3f}")
+    ear = resultado.get("ear")
+    if ear:
+        print(f"Aceleração da predição: {resultado['aceleracao']:.2f}x")
+        print(f"EAR: diferença média {ear['diferenca_media']:.4f}  p95 {ear['diferenca_p95']:.4f}  "
+              f"correlação {ear['correlacao']:.3f}")
+        print(f"Concordância olhos fechados (EAR < {ear['ear_threshold']}): "
+              f"{ear['concordancia_olhos_fechados'] * 100:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Treina e avalia o modelo de pontos faciais apenas dos olhos.")
+    adicionar_argumentos_configuracao(parser)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    converter = comandos.add_parser("converter", help="Reduz um XML de 68 pontos aos olhos.")
+    converter.add_argument("entrada", help="XML de anotações de 68 pontos.")
+    converter.add_argument("saida", help="XML gerado, apenas com os pontos dos olhos.")
+
+    treinar = comandos.add_parser("treinar", help="Treina o modelo só dos olhos.")
+    treinar.add_argument("anotacoes", help="XML de anotações de 68 pontos usado no treino.")
+    treinar.add_argument("saida", help="Arquivo .dat do modelo gerado.")
+    treinar.add_argument("--teste", help="XML de anotações de 68 pontos usado na avaliação.")
+    treinar.add_argument("--profundidade-arvore", type=int, default=PROFUNDIDADE_ARVORE)
+    treinar.add_argument("--profundidade-cascata", type=int, default=PROFUNDIDADE_CASCATA)
+    treinar.add_argument("--nu", type=float, default=NU)
+    treinar.add_argument("--sobreamostragem", type=int, default=SOBREAMOSTRAGEM)
+    treinar.add_argument("--pontos-candidatos", type=int, default=PONTOS_CANDIDATOS)
+    treinar.add_argument("--divisoes-teste", type=int, default=DIVISOES_TESTE)
+    treinar.add_argument("--threads", type=int, help="Threads do treino (padrão: todas).")
+
+    comparar = comandos.add_parser("comparar", help="Compara o modelo só dos olhos com o de 68 pontos.")
+    comparar.add_argument("video", help="Arquivo de vídeo (ou índice da câmera).")
+    comparar.add_argument("modelo_olhos", help="Arquivo .dat do modelo só dos olhos.")
+    comparar.add_argument("--modelo-completo",
+                          help="Arquivo .dat do modelo de 68 pontos (padrão: PREDICTOR_PATH).")
+    comparar.add_argument("--frames", type=int, help="Número máximo de frames processados.")
+    comparar.add_argument("--saida", help="Arquivo JSON onde o resultado é gravado.")
+    args = parser.parse_args()
+    aplicar_argumentos_configuracao(args)
+
+    if args.comando == "converter":
+        print("%d imagens, %d faces (%d descartadas)" % converter_anotacoes(args.entrada, args.saida))
+    elif args.comando == "treinar":
+        opcoes = criar_opcoes_treino(args.profundidade_arvore, args.profundidade_cascata, args.nu,
+                                     args.sobreamostragem, args.pontos_candidatos,
+                                     args.divisoes_teste, args.threads)
+        for nome, erro in treinar_modelo(args.anotacoes, args.saida, opcoes, args.teste).items():
+            print(f"{nome}: {erro:.3f} px")
+    else:
+        fonte = int(args.video) if args.video.isdigit() else args.video
+        video = initialize_video(fonte)
+        try:
+            resultado = comparar_modelos(video, args.modelo_completo or get_predictor_path(),
+                                         args.modelo_olhos, args.frames, get_ear_threshold())
+        finally:
+            video.release()
+        if resultado["modelos"]["modelo_olhos"]["pontos"] != MAPA_OLHOS.num_pontos:
+            print(f"Aviso: {args.modelo_olhos} não é um modelo só dos olhos.")
+        exibir_comparacao(resultado)
+        if args.saida:
+            with open(args.saida, "w") as arquivo:
+                json.dump(resultado, arquivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 # Importa as bibliotecas necessárias para operação do script.
+# O dlib, o scipy e o pygame são importados apenas quando usados, para acelerar a inicialização.
+import os
+import time
+from collections import namedtuple
+
 import cv2  # Usada para operações de captura e processamento de vídeo.
-import dlib  # Usada para detecção de faces e pontos faciais.
-import pygame  # Usada para reprodução de som.
-# Usada para cálculo de distâncias euclidianas.
-from scipy.spatial import distance as dist
+import numpy as np  # Usada para o cálculo vetorizado do EAR.
 # Importa funções de configuração para acessar parâmetros específicos.
 from config import get_predictor_path, get_sound_file_path, get_ear_threshold
+# Cache dos preditores de pontos faciais carregados no processo.
+from modelos import carregar_preditor
 
 # Inicializa a captura de vídeo a partir de uma fonte (por padrão, a webcam principal).
 
@@ -17,15 +21,57 @@ def initialize_video(video_source=0):
         raise Exception("Erro ao abrir a câmera.")
     return video  # Retorna o objeto de captura de vídeo.
 
+# FPS usado quando um arquivo de vídeo não informa o tempo dos frames nem a taxa de quadros.
+FPS_PADRAO = 30.0
+
+# Relógio dos frames: retorna o instante de captura do frame recém-lido, em segundos.
+# Em arquivos de vídeo é o tempo do próprio vídeo (CAP_PROP_POS_MSEC), de modo que as métricas
+# não dependem da velocidade do processamento; em câmeras e streams é o relógio monotônico.
+
+
+class RelogioVideo:
+    def __init__(self, video, arquivo=False, indice_inicial=0):
+        self.video = video
+        self.arquivo = arquivo
+        self.fps = (video.get(cv2.CAP_PROP_FPS) or FPS_PADRAO) if arquivo else 0
+        self.indice = indice_inicial
+
+    def __call__(self):
+        indice = self.indice
+        self.indice += 1
+        if not self.arquivo:
+            return time.monotonic()
+        posicao = self.video.get(cv2.CAP_PROP_POS_MSEC)
+        if posicao > 0 or indice == 0:
+            return posicao / 1000
+        # Contêineres sem o tempo de cada frame: usa o índice e a taxa de quadros declarada.
+        return indice / self.fps
+
+# Cria o relógio adequado à fonte de vídeo (arquivo local ou câmera/stream ao vivo).
+
+
+def criar_relogio_video(video, video_source, indice_inicial=0):
+    arquivo = isinstance(video_source, str) and os.path.isfile(video_source)
+    return RelogioVideo(video, arquivo, indice_inicial)
+
 # Inicializa o detector de faces e o preditor de pontos faciais usando a biblioteca dlib.
 
 
 def initialize_detector():
-    detector = dlib.get_frontal_face_detector()  # Cria um detector de faces.
-    # Carrega o preditor de pontos faciais usando o caminho fornecido pela função de configuração.
-    predictor = dlib.shape_predictor(get_predictor_path())
+    # Importa os backends de detecção de faces configuráveis (e, com eles, o dlib).
+    from face_detectors import criar_detector_faces
+    # Cria o detector de faces do backend escolhido no arquivo de configuração.
+    detector = criar_detector_faces()
+    predictor = initialize_predictor()
     return detector, predictor  # Retorna o detector e o preditor.
 
+# Carrega o preditor de pontos faciais usando o caminho fornecido pela função de configuração.
+# O modelo é lido do disco uma única vez por processo (ver modelos.py).
+
+
+def initialize_predictor():
+    return carregar_preditor(get_predictor_path())
+
 # Calcula o Eye Aspect Ratio (EAR) para estimar a abertura dos olhos com base nos pontos fornecidos.
 
 
@@ -39,6 +85,8 @@ def calcular_ear(pontos):
     Retorna:
     EAR -- O Eye Aspect Ratio calculado para o olho.
     """
+    # Usada para cálculo de distâncias euclidianas.
+    from scipy.spatial import distance as dist
 
     # Primeiro, calculamos as distâncias verticais entre os pontos superiores e inferiores das pálpebras.
     # Distância vertical superior: entre o ponto 2 e o ponto 6.
@@ -60,16 +108,129 @@ def calcular_ear(pontos):
 
     return EAR
 
+# Índices dos pontos de cada olho no modelo de 68 pontos faciais.
+OLHO_ESQUERDO = slice(36, 42)
+OLHO_DIREITO = slice(42, 48)
+OLHOS = slice(36, 48)
+
+# Mapa dos índices dos pontos dos olhos em um modelo de pontos faciais:
+# num_pontos -- Número de pontos retornados pelo shape_predictor.
+# olho_esquerdo, olho_direito, olhos -- Fatias com os seis pontos de cada olho e com os doze.
+MapaPontos = namedtuple("MapaPontos", ["num_pontos", "olho_esquerdo", "olho_direito", "olhos"])
+
+# Modelo completo de 68 pontos (shape_predictor_68_face_landmarks.dat).
+MAPA_68 = MapaPontos(68, OLHO_ESQUERDO, OLHO_DIREITO, OLHOS)
+# Modelo compacto apenas dos olhos: os pontos 36 a 47 do modelo completo, renumerados de 0 a 11
+# (ver treinar_preditor_olhos.py).
+MAPA_OLHOS = MapaPontos(12, slice(0, 6), slice(6, 12), slice(0, 12))
+
+# Retorna o mapa dos pontos dos olhos de um modelo com o número de pontos informado.
+
+
+def mapa_pontos(num_pontos):
+    for mapa in (MAPA_68, MAPA_OLHOS):
+        if mapa.num_pontos == num_pontos:
+            return mapa
+    raise ValueError(f"Modelo de pontos faciais não suportado: {num_pontos} pontos "
+                     f"(esperado {MAPA_68.num_pontos} ou {MAPA_OLHOS.num_pontos}).")
+
+# Converte o resultado do shape_predictor em um array NumPy contíguo de forma (num_pontos, 2).
+# Com out, os pontos são gravados em um array já alocado, que é reutilizado entre frames.
+
+
+def shape_para_array(shape, dtype=np.int32, out=None):
+    if out is None:
+        return np.array([(ponto.x, ponto.y) for ponto in shape.parts()], dtype=dtype)
+    for indice, ponto in enumerate(shape.parts()):
+        out[indice, 0] = ponto.x
+        out[indice, 1] = ponto.y
+    return out
+
+# Calcula o EAR de ambos os olhos de uma ou mais faces em uma única expressão NumPy.
+
+
+def calcular_ear_olhos(landmarks):
+    """
+    Calcula o Eye Aspect Ratio (EAR) dos dois olhos, de forma vetorizada.
+
+    Argumentos:
+    landmarks -- Array de forma (..., 68, 2) com os pontos faciais. Aceita uma face (68, 2),
+                 várias faces (faces, 68, 2) ou um lote inteiro (frames, faces, 68, 2).
+                 Com o modelo só dos olhos, a forma é (..., 12, 2).
+
+    Retorna:
+    EAR -- Array de forma (..., 2) com o EAR do olho esquerdo e do olho direito.
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    # Separa os seis pontos de cada olho: forma (..., 2, 6, 2).
+    olhos = landmarks[..., mapa_pontos(landmarks.shape[-2]).olhos, :]
+    olhos = olhos.reshape(olhos.shape[:-2] + (2, 6, 2))
+    # Distâncias entre os pares (2, 6), (3, 5) e (1, 4) de cada olho: forma (..., 2, 3).
+    distancias = np.linalg.norm(
+        olhos[..., [1, 2, 0], :] - olhos[..., [5, 4, 3], :], axis=-1)
+    return (distancias[..., 0] + distancias[..., 1]) / (2.0 * distancias[..., 2])
+
+# Calcula o EAR médio dos dois olhos para um lote de faces.
+
+
+def calcular_ear_lote(landmarks):
+    # Retorna um array de forma (...) com a média do EAR dos dois olhos de cada face.
+    return calcular_ear_olhos(landmarks).mean(axis=-1)
+
+# Desenha os pontos dos olhos (36 a 47, ou 0 a 11 no modelo só dos olhos) de uma face sobre o frame.
+
+
+def draw_eyes_points(frame, shape, cor_rgb):
+    # Converte a cor de RGB para BGR, pois o OpenCV usa BGR
+    cor_bgr = (cor_rgb[2], cor_rgb[1], cor_rgb[0])
+    # Aceita tanto o resultado do shape_predictor quanto um array (68, 2) já convertido.
+    if not isinstance(shape, np.ndarray):
+        shape = shape_para_array(shape)
+    # Loop pelos pontos dos olhos (incluindo ambos os olhos).
+    for x, y in shape[mapa_pontos(len(shape)).olhos]:
+        # Desenha uma pequena bolinha (círculo) em cada ponto com a cor especificada.
+        cv2.circle(frame, (int(x), int(y)), 2, cor_bgr, -1)
+
+# Calcula o FPS com base no número de frames processados a cada segundo.
+
+
+class ContadorFPS:
+    def __init__(self):
+        self.frame_count = 0
+        self.fps = 0
+        self.start_time = None
+
+    def atualizar(self, timestamp):
+        # Registra um frame processado no instante informado e retorna o FPS atual.
+        if self.start_time is None:
+            self.start_time = timestamp
+        self.frame_count += 1
+        elapsed_time = timestamp - self.start_time
+        if elapsed_time >= 1.0:
+            self.fps = self.frame_count / elapsed_time
+            self.frame_count = 0
+            self.start_time = timestamp
+        return self.fps
+
 # Controla a reprodução do som de alerta usando a biblioteca pygame.
 
 
 class SoundPlayer:
     def __init__(self, sound_file_path):
-        pygame.mixer.init()
+        # O mixer do pygame só é inicializado no primeiro alerta.
+        self.pygame = None
         self.sound_file_path = sound_file_path
         self.som_iniciado = False
 
     def play_sound(self, alerta_sono):
+        if self.pygame is None:
+            if not alerta_sono:
+                return
+            import pygame  # Usada para reprodução de som.
+            pygame.mixer.init()
+            self.pygame = pygame
+        pygame = self.pygame
+
         # Carrega o arquivo de som de alerta se não estiver ocupado ou se o som ainda não foi carregado
         if not pygame.mixer.music.get_busy():
             pygame.mixer.music.load(self.sound_file_path)